@@ -23,6 +23,27 @@ class C:
     MAX = 0
     MIN = 1
 
+    CHUNK_ROWS = 1024
+
+    LATEX_TABLE = "latex"
+    TEXT_TABLE = "text"
+    MARKDOWN_TABLE = "markdown"
+    CSV_TABLE = "csv"
+    HTML_TABLE = "html"
+    FORMAT_CACHE_SIZE = 4096
+    LATEX_STYLES = (r"\bf", r"\underline")
+
+    MEAN = "mean"
+    MEDIAN = "median"
+    STD = "std"
+    CI = "ci"
+    COUNT = "count"
+    CONFIDENCE = 0.95
+
+    PLOT_KIND = "kind"
+    LINE_PLOT = "line"
+    HIST_PLOT = "hist"
+
     STYLES = ["-", "--"]
     COLORS = [
         "tab:blue",
@@ -48,6 +69,15 @@ class C:
         "Could not load {0} from {1}."
     )
     SAVE_ERROR_MSG = "Could not save {0} in {1}"
+    FORMAT_ERROR_MSG = "Could not load {0}: unknown format or corrupted pickle"
+    CACHE_MODE_ERROR_MSG = "Unknown cache mode {0}. Accepted modes are share, copy and freeze"
+    WRITER_CLOSED_ERROR_MSG = "The writer is closed"
+    TABLE_FORMAT_ERROR_MSG = "Unknown table format {0}. Accepted formats are latex, text, markdown, csv and html"
+    STATISTIC_ERROR_MSG = "Unknown statistic {0}. Accepted statistics are mean, median, std and ci"
+    TWO_PASS_ERROR_MSG = "The rows of a two pass table must be re-iterable, not an iterator"
+    PLOT_KIND_ERROR_MSG = "Unknown plot kind {0}. Accepted kinds are line and hist"
+    APPEND_ERROR_MSG = "Could not append to {0}: its format does not support appending"
+    POOL_ERROR_MSG = "Unknown pool {0}. Accepted pools are thread and process"
     DATASET_ERROR_MSG = (
         "Error while parsing the dataset. Make sure dataset is a matrix."
     )
@@ -69,3 +99,40 @@ class C:
     JSON = 1
     TXT = 2
     PICKLE = 3
+    NPY = 4
+    NPZ = 5
+    JSONL = 6
+    LAZY_TXT = 7
+
+    JSON_FORMAT = "json"
+    JSONL_FORMAT = "jsonl"
+    TXT_FORMAT = "txt"
+    LAZY_TXT_FORMAT = "lazy txt"
+    PICKLE_FORMAT = "pickle"
+    NPY_FORMAT = "npy"
+    NPZ_FORMAT = "npz"
+
+    ASYNC_LIMIT = 16
+    WRITER_QUEUE_SIZE = 64
+
+    THREAD = "thread"
+    PROCESS = "process"
+
+    CACHE_SHARE = "share"
+    CACHE_COPY = "copy"
+    CACHE_FREEZE = "freeze"
+    CACHE_HIT = "hit"
+    CACHE_MISS = "miss"
+
+    LOAD_EVENT = "load"
+    SAVE_EVENT = "save"
+    SLOWEST_FILES = 10
+
+    BUFFERS_EXT = ".buffers"
+    OUT_OF_BAND_HEADER = "utils_unibs out-of-band buffers"
+    LINES_INDEX_EXT = ".lines.npy"
+    MANIFEST_FILE = ".manifest.json"
+    SHARDS_INDEX_EXT = ".shards.json"
+
+    LIST_SHARDS = "list"
+    NDARRAY_SHARDS = "ndarray"
@@ -1,102 +1,1859 @@
+import asyncio
+import bz2
+import copy
+import fnmatch
+import gzip
+import hashlib
+import heapq
 import json
+import logging
+import lzma
+import mmap
 import pickle
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 from os.path import join
+from types import MappingProxyType
 import os
+import numpy as np
 from utils_unibs.constants import C
 
 
+class _FileCache:
+    """
+    Class for handling the in-process cache of the loaded files. Entries are keyed by absolute path, size and
+    modification time, so edited files are invalidated automatically, and evicted in LRU order.
+
+    Attributes:
+        enabled: True if the loaded files are cached
+        max_entries: the maximum number of cached files
+        max_bytes: the maximum total size (on disk) of the cached files
+        mode: how cached objects are returned {'share', 'copy', 'freeze'}
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """
+        Implementation of the Singleton Pattern
+        """
+        if cls._instance is None:
+            cls._instance = super(_FileCache, cls).__new__(cls)
+            cls._instance.enabled = False
+            cls._instance.max_entries = 128
+            cls._instance.max_bytes = 1 << 30
+            cls._instance.mode = C.CACHE_COPY
+            cls._instance._lock = threading.Lock()
+            cls._instance.clear()
+        return cls._instance
+
+    def clear(self):
+        """
+        Removes all the cached files and resets the statistics
+        """
+        with self._lock:
+            self._entries = OrderedDict()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    @staticmethod
+    def key(read_file: str, type: int) -> tuple:
+        """
+        Computes the cache key of a file
+
+        Args:
+            read_file: string that contains the path to the file
+            type: an int that contains the type of the file
+
+        Returns:
+            A tuple (absolute path, type, size, modification time)
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+        """
+        st = os.stat(read_file)
+        return os.path.abspath(read_file), type, st.st_size, st.st_mtime_ns
+
+    def get(self, key: tuple) -> tuple:
+        """
+        Looks up a file in the cache. Outdated entries of the same file are discarded
+
+        Args:
+            key: the cache key of the file
+
+        Returns:
+            A tuple (hit, object). object is None when hit is False
+        """
+        with self._lock:
+            entry = self._entries.get(key[:2])
+            if entry is None or entry[0] != key:
+                if entry is not None:
+                    self._remove(key[:2])
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key[:2])
+            self.hits += 1
+            o = entry[1]
+        return True, self._output(o)
+
+    def put(self, key: tuple, o: object) -> object:
+        """
+        Stores a loaded file in the cache, evicting the least recently used files if needed
+
+        Args:
+            key: the cache key of the file
+            o: the loaded file
+
+        Returns:
+            the object to return to the caller
+        """
+        if self.mode == C.CACHE_FREEZE:
+            o = _freeze(o)
+        if key[2] > self.max_bytes or self.max_entries < 1:
+            return o
+        with self._lock:
+            self._remove(key[:2])
+            self._entries[key[:2]] = (key, o)
+            self._bytes += key[2]
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return self._output(o)
+
+    def _remove(self, path_key: tuple):
+        """
+        Removes an entry from the cache, if present. Must be called holding the lock
+
+        Args:
+            path_key: a tuple (absolute path, type)
+        """
+        entry = self._entries.pop(path_key, None)
+        if entry is not None:
+            self._bytes -= entry[0][2]
+
+    def _output(self, o: object) -> object:
+        """
+        Protects a cached object from the changes of the caller
+
+        Args:
+            o: the cached object
+
+        Returns:
+            a deep copy of o in 'copy' mode, o otherwise
+        """
+        if self.mode == C.CACHE_COPY:
+            return copy.deepcopy(o)
+        return o
+
+    def stats(self) -> dict:
+        """
+        Returns the cache statistics
+
+        Returns:
+            A dict that contains hits, misses, evictions, number of entries and total bytes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+def _freeze(o: object) -> object:
+    """
+    Recursively converts an object into a read-only version of itself
+
+    Args:
+        o: the object to freeze
+
+    Returns:
+        dicts as read-only mappings, lists as tuples, sets as frozensets, ndarrays as read-only views, other
+        objects unchanged
+    """
+    if isinstance(o, np.ndarray):
+        view = o.view()
+        view.flags.writeable = False
+        return view
+    elif isinstance(o, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in o.items()})
+    elif isinstance(o, (list, tuple)):
+        return tuple(_freeze(v) for v in o)
+    elif isinstance(o, set):
+        return frozenset(o)
+    return o
+
+
+CACHE = _FileCache()
+
+
+def set_cache(
+    enabled: bool = True,
+    max_entries: int = None,
+    max_bytes: int = None,
+    mode: str = None,
+):
+    """
+    Configure the in-process cache of the loaded files
+
+    Args:
+        enabled: True to cache the loaded files. Default is True
+        max_entries: the maximum number of cached files. None keeps the current value
+        max_bytes: the maximum total size (on disk) of the cached files. None keeps the current value
+        mode: how cached objects are returned {'share', 'copy', 'freeze'}. 'share' returns the cached object itself,
+              'copy' a deep copy, 'freeze' a read-only version. None keeps the current value
+
+    Returns:
+        True if the cache is configured correctly, False otherwise
+    """
+    if mode is not None and mode not in (C.CACHE_SHARE, C.CACHE_COPY, C.CACHE_FREEZE):
+        MONITOR.message(C.CACHE_MODE_ERROR_MSG.format(mode))
+        return False
+    if mode is not None and mode != CACHE.mode:
+        clear_cache()
+        CACHE.mode = mode
+    if max_entries is not None:
+        CACHE.max_entries = max_entries
+    if max_bytes is not None:
+        CACHE.max_bytes = max_bytes
+    CACHE.enabled = enabled
+    return True
+
+
+def clear_cache():
+    """
+    Empties the cache of the loaded files and resets its statistics
+    """
+    CACHE.clear()
+
+
+def get_cache_stats() -> dict:
+    """
+    Returns the statistics of the cache of the loaded files
+
+    Returns:
+        A dict that contains hits, misses, evictions, number of entries and total bytes
+    """
+    return CACHE.stats()
+
+
+class _Monitor:
+    """
+    Class for handling the instrumentation of the loaded and saved files. Each load and save emits an event, a
+    dict with action, path, format, bytes, time (seconds), cache status and ok, that is passed to the registered
+    hooks and aggregated in a summary. Events of the files loaded in a process pool are not collected.
+
+    Attributes:
+        quiet: True if the load and save messages are not printed
+        hooks: the list of functions called with each event
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        """
+        Implementation of the Singleton Pattern
+        """
+        if cls._instance is None:
+            cls._instance = super(_Monitor, cls).__new__(cls)
+            cls._instance.quiet = False
+            cls._instance.hooks = []
+            cls._instance._lock = threading.Lock()
+            cls._instance.reset()
+        return cls._instance
+
+    def reset(self):
+        """
+        Resets the aggregated summary
+        """
+        with self._lock:
+            self._summary = {
+                C.LOAD_EVENT: [0, 0, 0.0],
+                C.SAVE_EVENT: [0, 0, 0.0],
+            }
+            self._errors = 0
+            self._cache_hits = 0
+            self._slowest = []
+
+    def message(self, message: str):
+        """
+        Prints a message, unless in quiet mode, and logs it at debug level
+
+        Args:
+            message: the message
+        """
+        if not self.quiet:
+            print(message)
+        _logger.debug(message)
+
+    def emit(
+        self,
+        action: str,
+        path: str,
+        file_format: str,
+        size: int,
+        elapsed: float,
+        cache: str = None,
+        ok: bool = True,
+    ):
+        """
+        Aggregates an event in the summary and passes it to the hooks. Exceptions raised by the hooks are logged
+
+        Args:
+            action: the action of the event {'load', 'save'}
+            path: the path to the file
+            file_format: the format of the file
+            size: the bytes read or written
+            elapsed: the time spent to read or write the file, in seconds
+            cache: the cache status {None, 'hit', 'miss'}
+            ok: True if the action is successful
+        """
+        with self._lock:
+            totals = self._summary[action]
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += elapsed
+            if not ok:
+                self._errors += 1
+            if cache == C.CACHE_HIT:
+                self._cache_hits += 1
+            entry = (elapsed, path, action)
+            if len(self._slowest) < C.SLOWEST_FILES:
+                heapq.heappush(self._slowest, entry)
+            elif entry > self._slowest[0]:
+                heapq.heapreplace(self._slowest, entry)
+            hooks = list(self.hooks)
+        if hooks:
+            event = {
+                "action": action,
+                "path": path,
+                "format": file_format,
+                "bytes": size,
+                "time": elapsed,
+                "cache": cache,
+                "ok": ok,
+            }
+            for hook in hooks:
+                try:
+                    hook(event)
+                except Exception:
+                    # a faulty hook must not break loading and saving
+                    _logger.exception("Error in the monitor hook %r", hook)
+
+    def summary(self) -> dict:
+        """
+        Returns the aggregated summary of the events
+
+        Returns:
+            A dict that contains the number of loads and saves, bytes read and written, time spent, throughputs
+            (bytes per second), errors, cache hits and the slowest files
+        """
+        with self._lock:
+            loads, bytes_read, load_time = self._summary[C.LOAD_EVENT]
+            saves, bytes_written, save_time = self._summary[C.SAVE_EVENT]
+            return {
+                "loads": loads,
+                "saves": saves,
+                "bytes_read": bytes_read,
+                "bytes_written": bytes_written,
+                "load_time": load_time,
+                "save_time": save_time,
+                "read_throughput": bytes_read / load_time if load_time > 0 else 0.0,
+                "write_throughput": bytes_written / save_time if save_time > 0 else 0.0,
+                "errors": self._errors,
+                "cache_hits": self._cache_hits,
+                "slowest": [
+                    {"path": path, "action": action, "time": elapsed}
+                    for elapsed, path, action in sorted(self._slowest, reverse=True)
+                ],
+            }
+
+
+_logger = logging.getLogger(__name__)
+MONITOR = _Monitor()
+
+
+def set_quiet(quiet: bool = True):
+    """
+    Enables or disables the messages printed when files are loaded and saved. The messages are always logged at
+    debug level with the logging module
+
+    Args:
+        quiet: True to stop printing the messages. Default is True
+    """
+    MONITOR.quiet = quiet
+
+
+def add_hook(hook):
+    """
+    Registers a function that is called with the event of each loaded and saved file
+
+    Args:
+        hook: a function hook(event), where event is a dict with action ('load' or 'save'), path, format, bytes,
+              time (seconds), cache ('hit', 'miss' or None) and ok
+    """
+    with MONITOR._lock:
+        MONITOR.hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Unregisters a function registered with add_hook
+
+    Args:
+        hook: the function to unregister
+    """
+    with MONITOR._lock:
+        if hook in MONITOR.hooks:
+            MONITOR.hooks.remove(hook)
+
+
+def get_summary() -> dict:
+    """
+    Returns the aggregated statistics of the loaded and saved files
+
+    Returns:
+        A dict that contains the number of loads and saves, bytes read and written, time spent, throughputs
+        (bytes per second), errors, cache hits and the slowest files
+    """
+    return MONITOR.summary()
+
+
+def reset_summary():
+    """
+    Resets the aggregated statistics of the loaded and saved files
+    """
+    MONITOR.reset()
+
+
+_COMPRESSIONS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _split_compression(filename: str) -> tuple:
+    """
+    Splits the compression extension from a file name
+
+    Args:
+        filename: a string that contains the file name
+
+    Returns:
+        A tuple (file name without the compression extension, compression extension or None)
+    """
+    root, ext = os.path.splitext(filename)
+    if ext.lower() in _COMPRESSIONS:
+        return root, ext.lower()
+    return filename, None
+
+
+def _open_file(path: str, mode: str, compression_level: int = None):
+    """
+    Opens a file, transparently (de)compressing it when its name ends with .gz, .bz2 or .xz
+
+    Args:
+        path: a string that contains the path to the file
+        mode: the mode used to open the file {'r', 'rb', 'w', 'wb', 'a', 'ab'}
+        compression_level: an int that contains the compression level used when writing. None uses the default
+                           level of the compressor
+
+    Returns:
+        A file object
+    """
+    _, compression = _split_compression(path)
+    if compression is None:
+        return open(path, mode)
+    if "b" not in mode:
+        mode += "t"
+    if compression_level is None or "r" in mode:
+        return _COMPRESSIONS[compression](path, mode)
+    if compression == ".xz":
+        return lzma.open(path, mode, preset=compression_level)
+    return _COMPRESSIONS[compression](path, mode, compresslevel=compression_level)
+
+
+_TEMP_PREFIX = re.compile(r"^\.[0-9a-f]{32}\.")
+
+
+def _get_temp_path(path: str) -> str:
+    """
+    Returns a unique temporary path in the directory of a file, used to write it atomically
+
+    Args:
+        path: a string that contains the path to the target file
+
+    Returns:
+        the temporary path, the name of the target file preceded by a random id
+    """
+    return join(os.path.dirname(path), f".{uuid.uuid4().hex}.{os.path.basename(path)}")
+
+
+def _write_out_of_band(o: object, path: str, compression_level: int = None) -> str:
+    """
+    Pickles an object with protocol 5 writing its large buffers (e.g. numpy arrays) out-of-band, without copying
+    them into the pickle stream. The buffers are written, 64-byte aligned, in a new side-car file with a unique
+    name (the file name followed by a random id and C.BUFFERS_EXT), recorded in the header of the pickle. The
+    side-car of a previous save is never modified, so objects that still map it stay valid, and the pickle never
+    points to buffers that belong to another save
+
+    Args:
+        o: object to save
+        path: a string that contains the path to the target file
+        compression_level: an int that contains the compression level of the target file
+
+    Returns:
+        the path of the side-car file, None if the object has no buffers to write
+    """
+    buffers = []
+    stream = pickle.dumps(o, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    offsets = []
+    side_car = None
+    if any(raw.nbytes for raw in raws):
+        # named after the target file also when path is the temporary path of an atomic save
+        name = _TEMP_PREFIX.sub("", os.path.basename(path))
+        side_car = join(os.path.dirname(path), f"{name}.{uuid.uuid4().hex}{C.BUFFERS_EXT}")
+        with open(side_car, "wb") as wf:
+            position = 0
+            for raw in raws:
+                padding = -position % 64
+                wf.write(b"\0" * padding)
+                position += padding
+                wf.write(raw)
+                offsets.append((position, position + raw.nbytes))
+                position += raw.nbytes
+    else:
+        offsets = [(0, 0)] * len(raws)
+    header = (C.OUT_OF_BAND_HEADER, None if side_car is None else os.path.basename(side_car), offsets)
+    try:
+        with _open_file(path, "wb", compression_level) as wf:
+            pickle.dump(header, wf, protocol=5)
+            wf.write(stream)
+    except BaseException:
+        if side_car is not None:
+            os.remove(side_car)
+        raise
+    return side_car
+
+
+def _is_out_of_band_header(o: object) -> bool:
+    return type(o) is tuple and len(o) == 3 and isinstance(o[0], str) and o[0] == C.OUT_OF_BAND_HEADER
+
+
+def _get_side_car(read_file: str) -> str:
+    """
+    Returns the side-car file of a pickle saved with _write_out_of_band, reading only its header
+
+    Args:
+        read_file: string that contains the path to the file
+
+    Returns:
+        the path of the side-car file, None if the file has no side-car or is not an out-of-band pickle
+    """
+    try:
+        with _open_file(read_file, "rb") as rf:
+            if C.OUT_OF_BAND_HEADER.encode() not in rf.read(_MAGIC_LENGTH):
+                return None
+            rf.seek(0)
+            header = pickle.load(rf)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        return None
+    if not _is_out_of_band_header(header) or header[1] is None:
+        return None
+    return join(os.path.dirname(read_file), header[1])
+
+
+def _map_buffers(bf) -> object:
+    """
+    Maps a side-car file in copy-on-write mode without keeping its file descriptor open (Python 3.13+). On older
+    versions, whose maps keep a duplicate of the descriptor, the file is read in a single buffer instead
+
+    Args:
+        bf: the side-car file object, opened in binary mode
+
+    Returns:
+        a mmap or a bytearray that contains the side-car file
+    """
+    try:
+        return mmap.mmap(bf.fileno(), 0, access=mmap.ACCESS_COPY, trackfd=False)
+    except TypeError:
+        data = bytearray(os.fstat(bf.fileno()).st_size)
+        bf.readinto(data)
+        return data
+
+
+def _read_out_of_band(read_file: str, rf, header: tuple) -> object:
+    """
+    Loads an object saved with _write_out_of_band. The buffers are views of the side-car file, mapped once in
+    copy-on-write mode (see _map_buffers), so they are not copied one by one
+
+    Args:
+        read_file: string that contains the path to the file
+        rf: the file object of read_file, positioned after the header
+        header: the header of the file, that contains the name of the side-car file and the buffer offsets
+
+    Returns:
+        the loaded object
+    """
+    _, side_car, offsets = header
+    if side_car is None:
+        return pickle.load(rf, buffers=[b""] * len(offsets))
+    with open(join(os.path.dirname(read_file), side_car), "rb") as bf:
+        view = memoryview(_map_buffers(bf))
+    return pickle.load(rf, buffers=[view[start:end] for start, end in offsets])
+
+
+def _load_json(read_file: str, **options) -> object:
+    with _open_file(read_file, "r") as rf:
+        return json.load(rf)
+
+
+def _save_json(o: object, path: str, compression_level: int = None, compact: bool = False, **options):
+    with _open_file(path, "w", compression_level) as wf:
+        if compact:
+            json.dump(o, wf, separators=(",", ":"))
+        else:
+            json.dump(o, wf, indent=4)
+
+
+def _iter_jsonl_records(read_file: str):
+    with _open_file(read_file, "r") as rf:
+        for line in rf:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _load_jsonl(read_file: str, **options) -> object:
+    return list(_iter_jsonl_records(read_file))
+
+
+def _save_jsonl(o: object, path: str, compression_level: int = None, append: bool = False, **options):
+    if isinstance(o, Mapping):
+        # a single record, not an iterable of records
+        o = [o]
+    with _open_file(path, "a" if append else "w", compression_level) as wf:
+        for record in o:
+            wf.write(json.dumps(record, separators=(",", ":")))
+            wf.write("\n")
+
+
+def _load_txt(read_file: str, **options) -> object:
+    with _open_file(read_file, "r") as rf:
+        return rf.readlines()
+
+
+def _save_txt(o: object, path: str, compression_level: int = None, append: bool = False, **options):
+    with _open_file(path, "a" if append else "w", compression_level) as wf:
+        wf.writelines(o)
+
+
+class LazyLines:
+    """
+    Class for reading the lines of a big text file on demand. The offsets of its lines are stored in a side-car
+    index file (the file name followed by C.LINES_INDEX_EXT), so only the requested lines are read. The file is
+    opened only while the lines are read, so many instances do not hold file descriptors. It behaves like the list
+    returned by readlines.
+
+    Attributes:
+        path: the path to the text file
+    """
+
+    _CHUNK = 1 << 24
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: a string that contains the path to the text file
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+        """
+        self.path = path
+        st = os.stat(path)
+        self._offsets = self._get_offsets(st.st_size, st.st_mtime_ns)
+
+    def _get_offsets(self, size: int, mtime: int) -> np.ndarray:
+        """
+        Loads the line offsets from the index file, building it when it is missing or outdated
+
+        Args:
+            size: the size of the text file
+            mtime: the modification time of the text file
+
+        Returns:
+            an array that contains the start of each line followed by the size of the file
+        """
+        index_file = self.path + C.LINES_INDEX_EXT
+        try:
+            index = np.load(index_file)
+            if index[0] == size and index[1] == mtime:
+                return index[2:]
+        except (OSError, ValueError, IndexError):
+            pass
+
+        starts = [np.zeros(1, dtype=np.int64)]
+        buffer = bytearray(min(self._CHUNK, size))
+        with open(self.path, "rb") as rf:
+            begin = 0
+            while begin < size:
+                n = rf.readinto(buffer)
+                if not n:
+                    break
+                chunk = np.frombuffer(buffer, dtype=np.uint8, count=n)
+                starts.append(np.flatnonzero(chunk == ord("\n")).astype(np.int64) + begin + 1)
+                begin += n
+        offsets = np.concatenate(starts)
+        if offsets[-1] != size:
+            offsets = np.append(offsets, size)
+        try:
+            np.save(index_file, np.concatenate(([size, mtime], offsets)).astype(np.int64))
+        except OSError:
+            pass
+        return offsets
+
+    def _read(self, lines: range) -> list:
+        """
+        Reads some lines of the file, opening it only for the time of the read
+
+        Args:
+            lines: the range of the indices of the lines
+
+        Returns:
+            a list that contains the lines
+        """
+        offsets = self._offsets
+        result = []
+        with open(self.path, "rb") as rf:
+            if lines.step == 1 and len(lines) > 0:
+                # contiguous lines are read at once
+                begin = int(offsets[lines.start])
+                rf.seek(begin)
+                data = rf.read(int(offsets[lines.stop]) - begin)
+                for i in lines:
+                    result.append(data[offsets[i] - begin:offsets[i + 1] - begin])
+            else:
+                for i in lines:
+                    rf.seek(int(offsets[i]))
+                    result.append(rf.read(int(offsets[i + 1] - offsets[i])))
+        result = [line.decode() for line in result]
+        return [line[:-2] + "\n" if line.endswith("\r\n") else line for line in result]
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self._read(range(*item.indices(len(self))))
+        if item < 0:
+            item += len(self)
+        if item < 0 or item >= len(self):
+            raise IndexError(item)
+        return self._read(range(item, item + 1))[0]
+
+    def __iter__(self):
+        i = 0
+        while i < len(self):
+            # about _CHUNK bytes of lines are read at a time, and the file is closed between the reads
+            stop = int(np.searchsorted(self._offsets, self._offsets[i] + self._CHUNK, side="right")) - 1
+            stop = min(max(stop, i + 1), len(self))
+            yield from self._read(range(i, stop))
+            i = stop
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return LazyLines, (self.path,)
+
+    def close(self):
+        """
+        Does nothing, since the file is opened only while the lines are read. Kept so that LazyLines objects can
+        still be used as context managers
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _load_lazy_txt(read_file: str, **options) -> object:
+    if _split_compression(read_file)[1] is not None:
+        return _load_txt(read_file)
+    return LazyLines(read_file)
+
+
+def _load_npy(read_file: str, mmap_mode: str = None, **options) -> object:
+    if _split_compression(read_file)[1] is None:
+        return np.load(read_file, mmap_mode=mmap_mode)
+    with _open_file(read_file, "rb") as rf:
+        return np.load(rf)
+
+
+def _save_npy(o: object, path: str, compression_level: int = None, **options):
+    with _open_file(path, "wb", compression_level) as wf:
+        np.save(wf, np.asanyarray(o), allow_pickle=False)
+
+
+def _load_npz(read_file: str, **options) -> object:
+    with _open_file(read_file, "rb") as rf, np.load(rf) as npz:
+        return dict(npz)
+
+
+def _save_npz(o: object, path: str, compression_level: int = None, **options):
+    with _open_file(path, "wb", compression_level) as wf:
+        if isinstance(o, dict):
+            np.savez(wf, **o)
+        else:
+            np.savez(wf, o)
+
+
+def _load_pickle(read_file: str, **options) -> object:
+    with _open_file(read_file, "rb") as rf:
+        o = pickle.load(rf)
+        if _is_out_of_band_header(o):
+            return _read_out_of_band(read_file, rf, o)
+    return o
+
+
+def _save_pickle(
+    o: object, path: str, compression_level: int = None, out_of_band: bool = False, **options
+) -> str:
+    if out_of_band:
+        return _write_out_of_band(o, path, compression_level)
+    with _open_file(path, "wb", compression_level) as wf:
+        pickle.dump(o, wf)
+    return None
+
+
+_LOADERS = {}
+_SAVERS = {}
+_EXTENSIONS = {}
+_TYPES = {}
+_MAGIC = []
+_APPENDABLE = set()
+_MAGIC_LENGTH = 64
+
+
+def register_format(
+    name: str,
+    extensions: list,
+    loader=None,
+    saver=None,
+    magic: list = None,
+    type: int = None,
+    appendable: bool = False,
+):
+    """
+    Registers a file format, so that it is used by load_from_folder and save_file. Registering an existing name,
+    extension or type replaces it
+
+    Args:
+        name: a string that contains the name of the format
+        extensions: a list of extensions (e.g. ['.jsonl']) of the files in this format
+        loader: a function loader(read_file, **options) that returns the object in the file. Default is None
+        saver: a function saver(o, path, **options) that writes the object in the file. It receives the
+               compression_level, compact, out_of_band and append arguments of save_file. Default is None
+        magic: a list of byte strings that the content of the files in this format starts with, used to recognize
+               the files without a known extension. Leading whitespaces of the content are ignored. They are checked
+               before the magic bytes of the formats registered earlier. Default is None
+        type: an int to select this format in the type argument of load_from_folder. Default is None
+        appendable: True if the saver supports the append argument of save_file, writing o at the end of an
+                    existing file. Default is False
+    """
+    if loader is not None:
+        _LOADERS[name] = loader
+    if saver is not None:
+        _SAVERS[name] = saver
+    for ext in extensions:
+        _EXTENSIONS[ext.lower()] = name
+    if type is not None:
+        _TYPES[type] = name
+    if appendable:
+        _APPENDABLE.add(name)
+    else:
+        _APPENDABLE.discard(name)
+    # the new magic bytes replace the old ones of the format and take precedence over the other formats
+    magic = list(magic or [])
+    _MAGIC[:] = [(m, name) for m in magic] + [(m, n) for m, n in _MAGIC if n != name]
+
+
+def _sniff_format(read_file: str) -> str:
+    """
+    Recognizes the format of a file from its first bytes
+
+    Args:
+        read_file: string that contains the path to the file
+
+    Returns:
+        the name of the format, None if the content does not match any registered magic bytes
+    """
+    with _open_file(read_file, "rb") as rf:
+        head = rf.read(_MAGIC_LENGTH).lstrip()
+    for m, name in _MAGIC:
+        if head.startswith(m):
+            return name
+    return None
+
+
+def _get_format(filename: str, type: int = C.NONE, sniff: bool = False) -> str:
+    """
+    Returns the format of a file, looking up the type first, then the extension and the content
+
+    Args:
+        filename: string that contains the file name or path
+        type: an int that contains the type of the file
+        sniff: True to read the first bytes of the file when the extension is unknown
+
+    Returns:
+        the name of the format. Unknown files are treated as pickle files
+    """
+    if type != C.NONE:
+        return _TYPES.get(type, C.PICKLE_FORMAT)
+    name, _ = _split_compression(filename.lower())
+    file_format = _EXTENSIONS.get(os.path.splitext(name)[1])
+    if file_format is None and sniff:
+        file_format = _sniff_format(filename)
+    return file_format or C.PICKLE_FORMAT
+
+
+register_format(C.JSON_FORMAT, [".json"], _load_json, _save_json, [b"{", b"["], C.JSON)
+register_format(
+    C.JSONL_FORMAT, [".jsonl", ".ndjson"], _load_jsonl, _save_jsonl, type=C.JSONL, appendable=True
+)
+register_format(C.TXT_FORMAT, [".txt", ".pddl"], _load_txt, _save_txt, type=C.TXT, appendable=True)
+register_format(C.LAZY_TXT_FORMAT, [], _load_lazy_txt, _save_txt, type=C.LAZY_TXT, appendable=True)
+register_format(C.NPY_FORMAT, [".npy"], _load_npy, _save_npy, [b"\x93NUMPY"], C.NPY)
+register_format(C.NPZ_FORMAT, [".npz"], _load_npz, _save_npz, [b"PK\x03\x04"], C.NPZ)
+register_format(
+    C.PICKLE_FORMAT, [".pkl", ".pickle"], _load_pickle, _save_pickle, [b"\x80"], C.PICKLE
+)
+
+
+def _read_file(read_file: str, type: int = C.NONE, mmap_mode: str = None) -> tuple:
+    """
+    Reads a single file with the loader of its format, optionally compressed with gzip, bz2 or xz
+
+    Args:
+        read_file: string that contains the path to the file
+        type: an int that contains the type of the file
+        mmap_mode: the numpy memory-map mode used to open uncompressed npy files {None, 'r', 'r+', 'c'}
+
+    Returns:
+        A tuple (loaded file, name of the format)
+    """
+    file_format = _get_format(read_file, type, sniff=True)
+    return _LOADERS[file_format](read_file, mmap_mode=mmap_mode), file_format
+
+
+def _write_file(o: object, path: str, filename: str, **options) -> str:
+    """
+    Writes a given object in a file with the saver of its format
+
+    Args:
+        o: object to save
+        path: a string that contains the path to the target file
+        filename: a string that contains the target file name, used to select the format
+        **options: the options of the saver (compression_level, compact, out_of_band, append)
+
+    Returns:
+        the path of the side-car file with the out-of-band buffers, None if no side-car file is written
+    """
+    return _SAVERS[_get_format(filename)](o, path, **options) or None
+
+
 def _load_file(
     read_file: str,
     load_ok: str = "File loaded",
     error: str = f"Error while loading file",
     type: int = C.NONE,
+    mmap_mode: str = None,
 ) -> object:
     """
-    Load single file. It handles txt, pddl, json and pickle files
+    Load single file. It handles txt, pddl, json, npy, npz, pickle and the registered file formats. The file is
+    served from the cache when enabled, unless it is memory-mapped
 
     Args:
         read_file: string that contains the path to the file
         load_ok: string that contains the message to print when the loading is successful
         error: string that contains the message to print when the loading is not successful
+        type: an int that contains the type of the file
+        mmap_mode: the numpy memory-map mode used to open npy files {None, 'r', 'r+', 'c'}
 
     Returns:
-        the loaded file
+        the loaded file, None if the file could not be found or its format is unknown
     """
+    start = time.perf_counter()
+    cache = None
+    file_format = None
+    size = 0
     try:
-        if type == C.JSON or (type == C.NONE and read_file.lower().endswith(".json")):
-            with open(read_file, "r") as rf:
-                o = json.load(rf)
-        elif type == C.TXT or (
-            type == C.NONE
-            and (
-                read_file.lower().endswith(".txt")
-                or read_file.lower().endswith(".pddl")
-            )
-        ):
-            with open(read_file, "r") as rf:
-                o = rf.readlines()
+        if CACHE.enabled and mmap_mode is None:
+            key = CACHE.key(read_file, type)
+            hit, o = CACHE.get(key)
+            if hit:
+                cache = C.CACHE_HIT
+            else:
+                cache = C.CACHE_MISS
+                o, file_format = _read_file(read_file, type)
+                o = CACHE.put(key, o)
+                size = key[2]
         else:
-            with open(read_file, "rb") as rf:
-                o = pickle.load(rf)
-        print(load_ok)
+            o, file_format = _read_file(read_file, type, mmap_mode)
+            size = os.path.getsize(read_file)
+        MONITOR.message(load_ok)
+        ok = True
     except FileNotFoundError:
-        print(error)
+        MONITOR.message(error)
+        o = None
+        ok = False
+    except (pickle.UnpicklingError, EOFError):
+        # files of unknown format are read as pickles
+        MONITOR.message(C.FORMAT_ERROR_MSG.format(read_file))
         o = None
+        ok = False
 
+    MONITOR.emit(
+        C.LOAD_EVENT,
+        read_file,
+        file_format or _get_format(read_file, type),
+        size,
+        time.perf_counter() - start,
+        cache,
+        ok,
+    )
     return o
 
 
-def load_from_folder(read_dir: str, files: list, type: int = 0) -> list:
+def _load_from_folder(
+    read_dir: str, file_name: str, type: int = C.NONE, mmap_mode: str = None
+) -> object:
     """
-    Load files from a given folder. Supports txt, pddl, json and pickle files.
+    Load a single file from a given folder
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        file_name: a string that contains the file name within the folder
+        type: an int that contains the type of the file
+        mmap_mode: the numpy memory-map mode used to open npy files
+
+    Returns:
+        the loaded file, None if the file could not be found or its format is unknown
+    """
+    return _load_file(
+        join(read_dir, file_name),
+        load_ok=C.LOAD_OK_MSG.format(file_name, read_dir),
+        error=C.LOAD_ERROR_MSG.format(file_name, read_dir),
+        type=type,
+        mmap_mode=mmap_mode,
+    )
+
+
+def _get_executor(workers: int, pool: str = C.THREAD):
+    """
+    Creates the executor used to load files concurrently
+
+    Args:
+        workers: an int that contains the number of workers
+        pool: a string that contains the kind of pool {'thread', 'process'}
+
+    Returns:
+        A concurrent.futures executor
+
+    Raises:
+        ValueError: an error on the pool kind
+    """
+    if pool == C.THREAD:
+        return ThreadPoolExecutor(max_workers=workers)
+    elif pool == C.PROCESS:
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(C.POOL_ERROR_MSG.format(pool))
+
+
+def load_from_folder(
+    read_dir: str,
+    files: list,
+    type: int = 0,
+    workers: int = 0,
+    pool: str = C.THREAD,
+    mmap_mode: str = None,
+) -> list:
+    """
+    Load files from a given folder. Supports txt, pddl, json, npy, npz, pickle and the registered file formats.
+    Files without a known extension are recognized from their content.
 
     Args:
         read_dir: a string that contains the path to a folder
         files: a list of file names within the folder
+        type: an int that contains the type of the files. Default is C.NONE (inferred from the extension).
+              C.LAZY_TXT loads text files as LazyLines objects, that read only the requested lines
+        workers: an int that contains the number of concurrent workers. Values lower than 2 load the files serially.
+                 Default is 0
+        pool: a string that contains the kind of pool used when workers > 1 {'thread', 'process'}. Process pools
+              avoid the GIL when parsing big json files. Default is 'thread'
+        mmap_mode: the numpy memory-map mode used to open npy files {None, 'r', 'r+', 'c'}. With a memory map only
+                   the pages that are accessed are read from disk. Default is None
 
     Returns:
-        A list of loaded files
+        A list of loaded files, in the same order of files
+    """
+
+    load = partial(_load_from_folder, read_dir, type=type, mmap_mode=mmap_mode)
+
+    if workers is None or workers < 2 or len(files) < 2:
+        return list(map(load, files))
+
+    workers = min(workers, len(files))
+    # process pools receive the files in chunks, so each worker gets a few batches instead of one file at a time
+    chunksize = max(1, len(files) // (workers * 4)) if pool == C.PROCESS else 1
+    with _get_executor(workers, pool) as executor:
+        return list(executor.map(load, files, chunksize=chunksize))
+
+
+def _prefetch_files(
+    read_dir: str,
+    files: list,
+    type: int,
+    mmap_mode: str,
+    buffer: queue.Queue,
+    stop: threading.Event,
+):
+    """
+    Loads files in background and puts them in a bounded buffer. The loading stops when stop is set.
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        files: an iterable of file names within the folder
+        type: an int that contains the type of the files
+        mmap_mode: the numpy memory-map mode used to open npy files
+        buffer: the bounded queue where to put the (file_name, object, exception) triplets
+        stop: the event used by the consumer to stop the loading
     """
 
-    to_return = []
-    for file_name in files:
-        to_return.append(
-            _load_file(
-                join(read_dir, file_name),
-                load_ok=C.LOAD_OK_MSG.format(file_name, read_dir),
-                error=C.LOAD_ERROR_MSG.format(file_name, read_dir),
-                type=type,
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for file_name in files:
+            try:
+                o = _load_from_folder(read_dir, file_name, type=type, mmap_mode=mmap_mode)
+                item = (file_name, o, None)
+            except Exception as e:
+                item = (file_name, None, e)
+            if not put(item) or item[2] is not None:
+                return
+    except Exception as e:
+        # errors raised by the iterable of file names are forwarded to the consumer
+        put((None, None, e))
+    finally:
+        put(None)
+
+
+def iter_from_folder(
+    read_dir: str,
+    files: list,
+    type: int = 0,
+    prefetch: int = 0,
+    mmap_mode: str = None,
+):
+    """
+    Lazily load files from a given folder. Only the files waiting in the read-ahead buffer are kept in memory.
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        files: an iterable of file names within the folder
+        type: an int that contains the type of the files. Default is C.NONE (inferred from the extension)
+        prefetch: an int that contains the number of files to read ahead in a background thread. Value 0 loads
+                  each file only when requested. Default is 0
+        mmap_mode: the numpy memory-map mode used to open npy files {None, 'r', 'r+', 'c'}. Default is None
+
+    Yields:
+        (file_name, object) tuples, in the same order of files. object is None if the file could not be loaded
+    """
+    if prefetch is None or prefetch < 1:
+        for file_name in files:
+            yield file_name, _load_from_folder(
+                read_dir, file_name, type=type, mmap_mode=mmap_mode
             )
-        )
-    return to_return
+        return
+
+    buffer = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=_prefetch_files,
+        args=(read_dir, files, type, mmap_mode, buffer, stop),
+        daemon=True,
+    )
+    worker.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is None:
+                break
+            file_name, o, e = item
+            if e is not None:
+                raise e
+            yield file_name, o
+    finally:
+        stop.set()
+        worker.join()
 
 
-def save_file(o: object, target_dir: str, filename: str) -> bool:
+def _fsync(path: str):
     """
-    Saves a given object in a file. Supports txt, json and pickle files.
+    Flushes a file to disk
+
     Args:
-        o: object to save
+        path: a string that contains the path to the file
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_file(
+    o: object,
+    target_dir: str,
+    filename: str,
+    compression_level: int = None,
+    compact: bool = False,
+    out_of_band: bool = False,
+    atomic: bool = False,
+    append: bool = False,
+    shard_size: int = None,
+) -> bool:
+    """
+    Saves a given object in a file. Supports txt, json, npy, npz, pickle and the registered file formats. Files
+    whose name ends with .gz, .bz2 or .xz (e.g. results.json.gz) are compressed while they are written.
+    Args:
+        o: object to save. npy files require an array, npz files an array or a dict of arrays
         target_dir: path to the target directory. It is created if it does not exist
         filename: target file name. If needed it must contain the extension
+        compression_level: an int that contains the compression level (1-9, 0-9 for xz). None uses the default
+                           level of the compressor. Default is None
+        compact: True to write json files without indentation and whitespaces. Default is False
+        out_of_band: True to pickle with protocol 5 and write large buffers (e.g. numpy arrays) in a side-car file
+                     that is mapped when loading. Each save writes a new side-car and removes the previous one
+                     after the pickle is written. Only used for pickle files. Default is False
+        atomic: True to write the object in a temporary file that is flushed to disk and then renamed to filename,
+                so a crash never leaves a truncated file. Ignored when appending. Default is False
+        append: True to append o at the end of the file without rewriting its content: an iterable of records
+                (or a single dict) for jsonl files, one record per line, and a list of lines for txt files. The
+                formats that cannot append are not saved. Default is False
+        shard_size: an int to save a list-like object or an array in shards of shard_size elements, see
+                    save_sharded. None saves a single file. Default is None
 
     Returns:
         True if the saving is successful, False otherwise
     """
+    if shard_size is not None:
+        return save_sharded(
+            o,
+            target_dir,
+            filename,
+            shard_size,
+            compression_level=compression_level,
+            compact=compact,
+            out_of_band=out_of_band,
+            atomic=atomic,
+        )
 
     os.makedirs(target_dir, exist_ok=True)
+    path = join(target_dir, filename)
+    atomic = atomic and not append
+    start = time.perf_counter()
+    if append and _get_format(filename) not in _APPENDABLE:
+        MONITOR.message(C.APPEND_ERROR_MSG.format(filename))
+        MONITOR.emit(C.SAVE_EVENT, path, _get_format(filename), 0, time.perf_counter() - start, ok=False)
+        return False
+    previous_size = os.path.getsize(path) if append and os.path.exists(path) else 0
+    old_side_car = _get_side_car(path) if not append and os.path.exists(path) else None
+    side_car = None
+    write_path = path
+    if atomic:
+        write_path = _get_temp_path(path)
     try:
-        if filename.endswith(".json") or filename.endswith(".JSON"):
-            with open(join(target_dir, filename), "w") as wf:
-                json.dump(o, wf, indent=4)
-        elif filename.endswith(".txt") or filename.endswith(".TXT"):
-            with open(join(target_dir, filename), "w") as wf:
-                wf.writelines(o)
-        else:
-            with open(join(target_dir, filename), "wb") as wf:
-                pickle.dump(o, wf)
-        wf.close()
-        print(C.SAVE_OK_MSG.format(filename, target_dir))
-        return True
-    except pickle.PicklingError:
-        print(C.SAVE_ERROR_MSG.format(filename, target_dir))
+        try:
+            side_car = _write_file(
+                o,
+                write_path,
+                filename,
+                compression_level=compression_level,
+                compact=compact,
+                out_of_band=out_of_band,
+                append=append,
+            )
+            if atomic:
+                # the new side-car has a unique name, so it is complete before the pickle that points to it
+                # replaces the old one
+                if side_car:
+                    _fsync(side_car)
+                _fsync(write_path)
+                os.replace(write_path, path)
+        except BaseException:
+            if atomic:
+                for tmp in (write_path, side_car):
+                    if tmp is not None and os.path.exists(tmp):
+                        os.remove(tmp)
+            raise
+        if old_side_car is not None and old_side_car != side_car:
+            try:
+                os.remove(old_side_car)
+            except OSError:
+                pass
+        MONITOR.message(C.SAVE_OK_MSG.format(filename, target_dir))
+        ok = True
+    except (pickle.PicklingError, ValueError, TypeError, AttributeError):
+        MONITOR.message(C.SAVE_ERROR_MSG.format(filename, target_dir))
+        ok = False
+
+    size = os.path.getsize(path) - previous_size if ok else 0
+    if ok and side_car:
+        size += os.path.getsize(side_car)
+    MONITOR.emit(
+        C.SAVE_EVENT,
+        path,
+        _get_format(filename),
+        size,
+        time.perf_counter() - start,
+        ok=ok,
+    )
+    return ok
+
+
+def select_files(read_dir: str, pattern: str = None, regex: str = None) -> list:
+    """
+    Selects the files of a folder whose name matches a glob pattern and/or a regular expression. Hidden files and
+    the side-car files of this module are ignored
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        pattern: a glob pattern (e.g. '*.json') the file names must match. None matches all names. Default is None
+        regex: a regular expression the file names must match (re.search). None matches all names. Default is None
+
+    Returns:
+        A sorted list of file names
+    """
+    return sorted(_scan_entries(read_dir, pattern, regex))
+
+
+def _scan_entries(read_dir: str, pattern: str = None, regex: str = None) -> dict:
+    """
+    Lists the files of a folder with a single directory scan
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        pattern: a glob pattern the file names must match
+        regex: a regular expression the file names must match
+
+    Returns:
+        A dict that maps each file name to its os.stat_result
+    """
+    compiled = re.compile(regex) if regex is not None else None
+    entries = {}
+    with os.scandir(read_dir) as it:
+        for entry in it:
+            name = entry.name
+            if (
+                name.startswith(".")
+                or name.endswith(C.BUFFERS_EXT)
+                or name.endswith(C.LINES_INDEX_EXT)
+                or name.endswith(C.SHARDS_INDEX_EXT)
+                or (pattern is not None and not fnmatch.fnmatchcase(name, pattern))
+                or (compiled is not None and compiled.search(name) is None)
+                or not entry.is_file()
+            ):
+                continue
+            entries[name] = entry.stat()
+    return entries
+
+
+def _checksum(path: str) -> str:
+    """
+    Computes the sha256 checksum of a file, reading it in chunks
+
+    Args:
+        path: a string that contains the path to the file
+
+    Returns:
+        the hexadecimal digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as rf:
+        for chunk in iter(lambda: rf.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(read_dir: str) -> dict:
+    """
+    Loads the manifest persisted in a folder by scan_folder
+
+    Args:
+        read_dir: a string that contains the path to a folder
+
+    Returns:
+        the manifest of the folder, an empty dict if the folder has no manifest
+    """
+    try:
+        with open(join(read_dir, C.MANIFEST_FILE), "r") as rf:
+            return json.load(rf)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def scan_folder(
+    read_dir: str,
+    pattern: str = None,
+    regex: str = None,
+    checksum: bool = False,
+    previous: dict = None,
+    save: bool = False,
+) -> dict:
+    """
+    Builds the manifest of a folder, a dict that maps each selected file name to its size, mtime, format and
+    optionally checksum. Checksums of the files unchanged since the previous manifest are not recomputed
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        pattern: a glob pattern (e.g. '*.json') the file names must match. Default is None
+        regex: a regular expression the file names must match. Default is None
+        checksum: True to store the sha256 checksum of each file. Default is False
+        previous: a previous manifest of the folder. None uses the manifest persisted in the folder. Default is None
+        save: True to persist the manifest in the folder (C.MANIFEST_FILE). Default is False
+
+    Returns:
+        the manifest of the folder
+    """
+    if previous is None:
+        previous = load_manifest(read_dir)
+    manifest = {}
+    for name, st in _scan_entries(read_dir, pattern, regex).items():
+        entry = {
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "format": _get_format(name),
+        }
+        if checksum:
+            old = previous.get(name, {})
+            if old.get("size") == st.st_size and old.get("mtime") == st.st_mtime_ns and "hash" in old:
+                entry["hash"] = old["hash"]
+            else:
+                entry["hash"] = _checksum(join(read_dir, name))
+        manifest[name] = entry
+    if save:
+        save_file(manifest, read_dir, C.MANIFEST_FILE, compact=True, atomic=True)
+    return manifest
+
+
+def changed_since(
+    read_dir: str,
+    manifest: dict,
+    pattern: str = None,
+    regex: str = None,
+    checksum: bool = False,
+) -> list:
+    """
+    Returns the files of a folder that are new or modified since a manifest was built
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        manifest: a manifest of the folder built by scan_folder
+        pattern: a glob pattern (e.g. '*.json') the file names must match. Default is None
+        regex: a regular expression the file names must match. Default is None
+        checksum: True to compare the checksums of the files whose size or mtime changed, so that files rewritten
+                  with the same content are not returned. Requires a manifest with checksums. Default is False
+
+    Returns:
+        A sorted list of file names, ready to be passed to load_from_folder
+    """
+    changed = []
+    for name, st in _scan_entries(read_dir, pattern, regex).items():
+        old = manifest.get(name)
+        if old is not None and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+            continue
+        if (
+            checksum
+            and old is not None
+            and old.get("hash") is not None
+            and old["size"] == st.st_size
+            and old["hash"] == _checksum(join(read_dir, name))
+        ):
+            continue
+        changed.append(name)
+    return sorted(changed)
+
+
+def iter_jsonl(read_dir: str, file_name: str, condition=None, limit: int = None):
+    """
+    Lazily reads the records of a jsonl file, one line at a time, so the file is never loaded in memory
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        file_name: a string that contains the name of the jsonl file within the folder. It can be compressed
+        condition: a function that returns True for the records to yield. None yields all the records. Default is None
+        limit: an int that contains the maximum number of records to yield. None yields all the records.
+               Default is None
+
+    Yields:
+        the records of the file, in order
+    """
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    for record in _iter_jsonl_records(join(read_dir, file_name)):
+        if condition is None or condition(record):
+            yield record
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def _shard_name(filename: str, shard: int) -> str:
+    """
+    Returns the name of a shard, keeping the extensions of the file name
+
+    Args:
+        filename: a string that contains the file name (e.g. 'episodes.json.gz')
+        shard: the index of the shard
+
+    Returns:
+        the name of the shard (e.g. 'episodes.00003.json.gz')
+    """
+    root, compression = _split_compression(filename)
+    stem, ext = os.path.splitext(root)
+    return f"{stem}.{shard:05d}{ext}{compression or ''}"
+
+
+def save_sharded(o: object, target_dir: str, filename: str, shard_size: int, **kwargs) -> bool:
+    """
+    Saves a list-like object or an array split in shards of shard_size elements (along the first axis), plus a
+    small index file (the file name followed by C.SHARDS_INDEX_EXT). Each shard is saved with save_file in the
+    format of the file name
+
+    Args:
+        o: a list-like object or an array to save
+        target_dir: path to the target directory. It is created if it does not exist
+        filename: target file name, used to name the shards
+        shard_size: an int that contains the number of elements of each shard
+        **kwargs: the other arguments of save_file
+
+    Returns:
+        True if the saving is successful, False otherwise
+    """
+    if shard_size is None or shard_size < 1:
+        MONITOR.message(C.SAVE_ERROR_MSG.format(filename, target_dir))
+        return False
+    is_array = isinstance(o, np.ndarray)
+    total = len(o)
+    names = []
+    lengths = []
+    for shard, begin in enumerate(range(0, total, shard_size)):
+        part = o[begin:begin + shard_size]
+        if not is_array:
+            part = list(part)
+        names.append(_shard_name(filename, shard))
+        lengths.append(len(part))
+        if not save_file(part, target_dir, names[-1], **kwargs):
+            return False
+
+    old = _load_shards_index(target_dir, filename)
+    index = {
+        "kind": C.NDARRAY_SHARDS if is_array else C.LIST_SHARDS,
+        "total": total,
+        "shards": names,
+        "lengths": lengths,
+    }
+    if not save_file(index, target_dir, filename + C.SHARDS_INDEX_EXT, compact=True, atomic=True):
         return False
+    for name in set(old.get("shards", [])) - set(names):
+        if os.path.exists(join(target_dir, name)):
+            os.remove(join(target_dir, name))
+    return True
+
+
+def _load_shards_index(read_dir: str, filename: str) -> dict:
+    """
+    Loads the index of a sharded file
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        filename: a string that contains the name of the sharded file
+
+    Returns:
+        the index of the sharded file, an empty dict if it does not exist
+    """
+    try:
+        with open(join(read_dir, filename + C.SHARDS_INDEX_EXT), "r") as rf:
+            return json.load(rf)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def load_sharded(
+    read_dir: str,
+    filename: str,
+    start: int = None,
+    stop: int = None,
+    workers: int = 0,
+    pool: str = C.THREAD,
+    mmap_mode: str = None,
+) -> object:
+    """
+    Loads an object saved with save_sharded, or only the elements between start and stop. Only the shards that
+    contain the requested elements are read, optionally in parallel
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        filename: a string that contains the name of the sharded file
+        start: an int that contains the first element to load (included). None starts from the beginning.
+               Default is None
+        stop: an int that contains the last element to load (not included). None loads until the end. Default is None
+        workers: an int that contains the number of concurrent workers. Default is 0
+        pool: a string that contains the kind of pool used when workers > 1 {'thread', 'process'}. Default is 'thread'
+        mmap_mode: the numpy memory-map mode used to open npy shards. Default is None
+
+    Returns:
+        the list or array of the requested elements, None if the sharded file could not be loaded
+    """
+    index = _load_shards_index(read_dir, filename)
+    if not index:
+        MONITOR.message(C.LOAD_ERROR_MSG.format(filename, read_dir))
+        return None
+    start, stop, _ = slice(start, stop).indices(index["total"])
+    ends = np.cumsum(index["lengths"], dtype=np.int64)
+    begins = ends - np.asarray(index["lengths"], dtype=np.int64)
+    selected = np.flatnonzero((ends > start) & (begins < stop))
+    parts = load_from_folder(
+        read_dir,
+        [index["shards"][i] for i in selected],
+        workers=workers,
+        pool=pool,
+        mmap_mode=mmap_mode,
+    )
+    if any(part is None for part in parts):
+        return None
+    offset = int(begins[selected[0]]) if len(selected) > 0 else 0
+    if index["kind"] == C.NDARRAY_SHARDS:
+        if len(parts) == 0:
+            return np.empty(0)
+        o = parts[0] if len(parts) == 1 else np.concatenate(parts)
+    else:
+        o = [element for part in parts for element in part]
+    return o[start - offset:stop - offset]
+
+
+class BackgroundWriter:
+    """
+    Class for saving files in a background thread. Jobs are accepted in a bounded queue and repeated saves to the
+    same file that are still waiting are coalesced, so only the latest object is written.
+    The objects are serialized when their job is executed, so they must not be modified after being submitted.
+
+    Attributes:
+        max_pending: the maximum number of jobs waiting in the queue
+        atomic: True if the files are written atomically
+        coalesced: the number of jobs replaced by a newer save to the same file
+        failed: a list of (target_dir, filename) tuples that could not be saved
+    """
+
+    def __init__(self, max_pending: int = C.WRITER_QUEUE_SIZE, atomic: bool = True):
+        """
+        Args:
+            max_pending: the maximum number of jobs waiting in the queue. submit blocks when the queue is full.
+                         Default is C.WRITER_QUEUE_SIZE
+            atomic: True to write the files atomically. Default is True
+        """
+        self.max_pending = max(1, max_pending)
+        self.atomic = atomic
+        self.coalesced = 0
+        self.failed = []
+        self._pending = OrderedDict()
+        self._running = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, o: object, target_dir: str, filename: str, **kwargs):
+        """
+        Adds a save_file job to the queue. If a job for the same file is still waiting, it is replaced
+
+        Args:
+            o: object to save
+            target_dir: path to the target directory
+            filename: target file name
+            **kwargs: the other arguments of save_file
+
+        Raises:
+            RuntimeError: if the writer is closed
+        """
+        key = os.path.abspath(join(target_dir, filename))
+        kwargs.setdefault("atomic", self.atomic)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(C.WRITER_CLOSED_ERROR_MSG)
+            if key in self._pending:
+                self.coalesced += 1
+            else:
+                while len(self._pending) >= self.max_pending:
+                    self._condition.wait()
+            self._pending[key] = (o, target_dir, filename, kwargs)
+            self._condition.notify_all()
+
+    def _run(self):
+        """
+        Executes the jobs in the queue until the writer is closed
+        """
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                _, (o, target_dir, filename, kwargs) = self._pending.popitem(last=False)
+                self._running += 1
+                self._condition.notify_all()
+            try:
+                ok = save_file(o, target_dir, filename, **kwargs)
+            except Exception:
+                ok = False
+            with self._condition:
+                if not ok:
+                    self.failed.append((target_dir, filename))
+                self._running -= 1
+                self._condition.notify_all()
+
+    def flush(self):
+        """
+        Waits until all the submitted jobs are written
+        """
+        with self._condition:
+            while self._pending or self._running:
+                self._condition.wait()
+
+    def close(self):
+        """
+        Writes all the submitted jobs and stops the background thread
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+async def _run_limited(semaphore: asyncio.Semaphore, executor, function, *args, **kwargs):
+    """
+    Runs a blocking function in an executor, waiting for the semaphore if given
+
+    Args:
+        semaphore: the semaphore that limits the concurrency. Can be None
+        executor: the executor where to run the function. None uses the default executor of the loop
+        function: the blocking function
+        *args: positional arguments of the function
+        **kwargs: keyword arguments of the function
+
+    Returns:
+        the value returned by the function
+    """
+    loop = asyncio.get_running_loop()
+    call = partial(function, *args, **kwargs)
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
+
+
+async def aload_from_folder(
+    read_dir: str,
+    files: list,
+    type: int = 0,
+    limit: int = C.ASYNC_LIMIT,
+    executor=None,
+    mmap_mode: str = None,
+) -> list:
+    """
+    Asynchronously load files from a given folder. The files are loaded in an executor, so the event loop is not
+    blocked. Same contract as load_from_folder.
+
+    Args:
+        read_dir: a string that contains the path to a folder
+        files: a list of file names within the folder
+        type: an int that contains the type of the files. Default is C.NONE (inferred from the extension)
+        limit: an int that contains the maximum number of files loaded at the same time. Values lower than 1 do not
+               limit the concurrency. Default is C.ASYNC_LIMIT
+        executor: the concurrent.futures executor where to load the files. None uses the default executor of the loop
+        mmap_mode: the numpy memory-map mode used to open npy files {None, 'r', 'r+', 'c'}. Default is None
+
+    Returns:
+        A list of loaded files, in the same order of files
+    """
+    semaphore = asyncio.Semaphore(limit) if limit is not None and limit > 0 else None
+    return list(
+        await asyncio.gather(
+            *[
+                _run_limited(
+                    semaphore,
+                    executor,
+                    _load_from_folder,
+                    read_dir,
+                    file_name,
+                    type=type,
+                    mmap_mode=mmap_mode,
+                )
+                for file_name in files
+            ]
+        )
+    )
+
+
+async def asave_file(
+    o: object,
+    target_dir: str,
+    filename: str,
+    semaphore: asyncio.Semaphore = None,
+    executor=None,
+    **kwargs,
+) -> bool:
+    """
+    Asynchronously saves a given object in a file. The file is written in an executor, so the event loop is not
+    blocked. Same contract as save_file.
+
+    Args:
+        o: object to save
+        target_dir: path to the target directory. It is created if it does not exist
+        filename: target file name. If needed it must contain the extension
+        semaphore: an asyncio.Semaphore shared by the concurrent saves to limit how many files are written at the same
+                   time. Default is None
+        executor: the concurrent.futures executor where to save the file. None uses the default executor of the loop
+        **kwargs: the other arguments of save_file
+
+    Returns:
+        True if the saving is successful, False otherwise
+    """
+    return await _run_limited(
+        semaphore, executor, save_file, o, target_dir, filename, **kwargs
+    )
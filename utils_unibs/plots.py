@@ -1,6 +1,10 @@
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 from utils_unibs.constants import C
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import io
 import warnings
 
 
@@ -374,6 +378,75 @@ def _set_axis_ticks(ax: plt.Axes, ticks: list, labels: list, axis: str):
     return ax
 
 
+def _save_figure(fig: plt.Figure, save_fig: str) -> str:
+    """
+    Saves a figure in png
+
+    Args:
+        fig: the Figure to save
+        save_fig: a string containing the path where to save the figure. The .png extension is added if missing
+
+    Returns:
+        A string containing the path of the saved figure
+    """
+    if not save_fig.endswith(".png"):
+        save_fig += ".png"
+    fig.savefig(save_fig, bbox_inches="tight")
+    return save_fig
+
+
+def _draw_line_plot(
+    fig: plt.Figure,
+    ax: plt.Axes,
+    dataset: list,
+    xticks: list = [],
+    xticks_labels: list = None,
+    yticks: list = [],
+    yticks_labels: list = None,
+    labels: list = None,
+    xlabel: str = None,
+    ylabel: str = None,
+    legend_title: str = None,
+    title: str = None,
+    styles: list = C.STYLES,
+    colors: list = C.COLORS,
+    markers: list = C.MARKERS,
+):
+    """
+    Draws a line plot of the dataset on a given figure, using only the Figure and Axes objects
+
+    Args:
+        fig: the Figure where to plot
+        ax: the Axes where to plot
+        dataset: the other arguments are the same of get_line_plot
+
+    Returns:
+        True if the dataset was plotted, False if the dataset is not a matrix
+    """
+    dataset = np.asanyarray(dataset)
+    if xticks is None:
+        xticks = []
+    if yticks is None:
+        yticks = []
+    if len(dataset.shape) != 2:
+        return False
+
+    x_axis = range(dataset.shape[1])
+    fig, ax = _line_plot(dataset, x_axis, fig, ax, labels, styles, markers, colors)
+
+    ax = _set_axis_ticks(ax, xticks, xticks_labels, C.X)
+    ax = _set_axis_ticks(ax, yticks, yticks_labels, C.Y)
+
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if labels is not None:
+        fig.legend(
+            bbox_to_anchor=(0.95, 0.5), loc="center left", title=legend_title
+        )
+    return True
+
+
 def get_line_plot(
     dataset: list,
     xticks: list = [],
@@ -389,6 +462,7 @@ def get_line_plot(
     styles: list = C.STYLES,
     colors: list = C.COLORS,
     markers: list = C.MARKERS,
+    show: bool = True,
 ):
     """
     Returns a line plot of the dataset
@@ -409,37 +483,22 @@ def get_line_plot(
         styles: a list containing pyplot styles
         markers: a list containing pyplot markers
         colors: a list containing pyplot colors
+        show: False to not show the figure (e.g. on headless machines); default is True
 
     Returns:
         A tuple that contains the plotted figure and axis
 
     """
 
-    dataset = np.asanyarray(dataset)
-    if xticks is None:
-        xticks = []
-    if yticks is None:
-        yticks = []
     fig, ax = plt.subplots(facecolor='w')
-    if len(dataset.shape) == 2:
-        x_axis = range(dataset.shape[1])
-        fig, ax = _line_plot(dataset, x_axis, fig, ax, labels, styles, markers, colors)
-
-        ax = _set_axis_ticks(ax, xticks, xticks_labels, C.X)
-        ax = _set_axis_ticks(ax, yticks, yticks_labels, C.Y)
-
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.set_title(title)
-        if labels is not None:
-            fig.legend(
-                bbox_to_anchor=(0.95, 0.5), loc="center left", title=legend_title
-            )
+    if _draw_line_plot(
+        fig, ax, dataset, xticks, xticks_labels, yticks, yticks_labels, labels, xlabel, ylabel, legend_title,
+        title, styles, colors, markers,
+    ):
         if save_fig is not None:
-            if not save_fig.endswith(".png"):
-                save_fig += ".png"
-            plt.savefig(save_fig, bbox_inches="tight")
-        plt.show()
+            _save_figure(fig, save_fig)
+        if show:
+            plt.show()
         plt.close(fig)
 
     else:
@@ -447,6 +506,88 @@ def get_line_plot(
     return fig, ax
 
 
+def _draw_hist_plot(
+        fig: plt.Figure,
+        ax: plt.Axes,
+        dataset: list,
+        xticks: list = None,
+        xticks_labels: list = None,
+        yticks: list = None,
+        yticks_labels: list = None,
+        labels: list = None,
+        xlabel: str = None,
+        ylabel: str = None,
+        legend_title: str = None,
+        title: str = None,
+        eps1: float = 0.1,
+        eps2: float = 0.1,
+        colors: list = C.COLORS,
+):
+    """
+    Draws a bar plot of the dataset on a given figure, using only the Figure and Axes objects
+
+    Args:
+        fig: the Figure where to plot
+        ax: the Axes where to plot
+        dataset: the other arguments are the same of get_hist_plot
+
+    Returns:
+        True if the dataset was plotted, False if the dataset is not a matrix
+    """
+
+    dataset = np.asanyarray(dataset)
+    if xticks is None:
+        xticks = []
+    if yticks is None:
+        yticks = []
+
+    if eps1 < 0:
+        eps1 = 0
+    elif eps1 > 0.1:
+        eps1 = 0.1
+    if eps2 < 0:
+        eps2 = 0
+    elif eps2 > 0.1:
+        eps2 = 0.1
+
+    if len(dataset.shape) != 2:
+        return False
+
+    w = (1 - (2 * eps1)) / dataset.shape[0]
+    for i in range(dataset.shape[0]):
+        for j in range(dataset.shape[1]):
+            try:
+                if j == 0 and labels is not None:
+                    mylabel = labels[i]
+                else:
+                    raise IndexError
+            except IndexError:
+                mylabel = None
+            try:
+                color = colors[i]
+            except IndexError:
+                w_msg = C.WARNING_MSG.format(f"colors[{i}]", C.DEFAULT_COLOR)
+                warnings.warn(w_msg)
+                color = C.DEFAULT_COLOR
+            ax.bar(
+                j - 0.5 + eps1 + w / 2 + i * w,
+                dataset[i][j],
+                color=color,
+                width=w - eps2,
+                label=mylabel,
+            )
+
+    ax = _set_axis_ticks(ax, xticks, xticks_labels, C.X)
+    ax = _set_axis_ticks(ax, yticks, yticks_labels, C.Y)
+
+    if labels is not None:
+        fig.legend(bbox_to_anchor=(0.95, 0.5), loc="center left", title=legend_title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return True
+
+
 def get_hist_plot(
         dataset: list,
         xticks: list = None,
@@ -462,6 +603,7 @@ def get_hist_plot(
         eps1: float = 0.1,
         eps2: float = 0.1,
         colors: list = C.COLORS,
+        show: bool = True,
 ):
     """
     Returns a bar plot of the dataset
@@ -480,69 +622,117 @@ def get_hist_plot(
         eps1: a float that represents the space between the columns in different ticks. Must be between 0 and 0.1
         eps2: a float that represents the space between the columns in the same tick. Must be between 0 and 0.1
         colors: a list containing pyplot colors
+        show: False to not show the figure (e.g. on headless machines); default is True
 
     Returns:
         A tuple that contains the plotted figure and axis
     """
 
-    dataset = np.asanyarray(dataset)
-    if xticks is None:
-        xticks = []
-    if yticks is None:
-        yticks = []
-
-    if eps1 < 0:
-        eps1 = 0
-    elif eps1 > 0.1:
-        eps1 = 0.1
-    if eps2 < 0:
-        eps2 = 0
-    elif eps2 > 0.1:
-        eps2 = 0.1
-
     fig, ax = plt.subplots(facecolor='w')
-    if len(dataset.shape) == 2:
-        w = (1 - (2 * eps1)) / dataset.shape[0]
-        for i in range(dataset.shape[0]):
-            for j in range(dataset.shape[1]):
-                try:
-                    if j == 0 and labels is not None:
-                        mylabel = labels[i]
-                    else:
-                        raise IndexError
-                except IndexError:
-                    mylabel = None
-                try:
-                    color = colors[i]
-                except IndexError:
-                    w_msg = C.WARNING_MSG.format(f"colors[{i}]", C.DEFAULT_COLOR)
-                    warnings.warn(w_msg)
-                    color = C.DEFAULT_COLOR
-                ax.bar(
-                    j - 0.5 + eps1 + w / 2 + i * w,
-                    dataset[i][j],
-                    color=color,
-                    width=w - eps2,
-                    label=mylabel,
-                )
-        
-        ax = _set_axis_ticks(ax, xticks, xticks_labels, C.X)
-        ax = _set_axis_ticks(ax, yticks, yticks_labels, C.Y)
-
-        if labels is not None:
-            fig.legend(bbox_to_anchor=(0.95, 0.5), loc="center left", title=legend_title)
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.set_title(title)
+    if _draw_hist_plot(
+        fig, ax, dataset, xticks, xticks_labels, yticks, yticks_labels, labels, xlabel, ylabel, legend_title,
+        title, eps1, eps2, colors,
+    ):
         if save_fig is not None:
-            if not save_fig.endswith(".png"):
-                save_fig += ".png"
-            plt.savefig(save_fig, bbox_inches="tight")
-        plt.show()
+            _save_figure(fig, save_fig)
+        if show:
+            plt.show()
         plt.close(fig)
     else:
         print(C.DATASET_ERROR_MSG)
     return fig, ax
 
 
+_DRAWERS = {
+    C.LINE_PLOT: _draw_line_plot,
+    C.HIST_PLOT: _draw_hist_plot,
+}
+
+
+def _render_plot(spec: dict):
+    """
+    Renders a plot spec with the Agg canvas, without pyplot and its figure manager
+
+    Args:
+        spec: a dict that contains the plot kind {'line', 'hist'} under the 'kind' key (default is 'line') and the
+              arguments of get_line_plot or get_hist_plot
+
+    Returns:
+        the path of the saved figure if spec contains save_fig, the png bytes of the figure otherwise.
+        None if the dataset is not a matrix
+
+    Raises:
+        ValueError: an error on the plot kind
+    """
+    spec = dict(spec)
+    kind = spec.pop(C.PLOT_KIND, C.LINE_PLOT)
+    if kind not in _DRAWERS:
+        raise ValueError(C.PLOT_KIND_ERROR_MSG.format(kind))
+    save_fig = spec.pop("save_fig", None)
+    spec.pop("show", None)
+
+    fig = Figure(facecolor="w")
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    if not _DRAWERS[kind](fig, ax, **spec):
+        print(C.DATASET_ERROR_MSG)
+        return None
+    if save_fig is not None:
+        return _save_figure(fig, save_fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _init_worker(sizes: tuple, dimensions: dict):
+    """
+    Replicates the character sizes and the dimensions of the parent process in a worker process
+
+    Args:
+        sizes: a tuple (small, medium, big) that contains the character sizes
+        dimensions: a dict that contains the size of each parameter, like DIMENSIONS
+    """
+    CS._SMALL_SIZE, CS._MEDIUM_SIZE, CS._BIGGER_SIZE = sizes
+    DIMENSIONS.update(dimensions)
+    update_dimensions()
+
+
+def render_plots(specs: list, workers: int = 0, pool: str = C.PROCESS) -> list:
+    """
+    Renders many plots without showing them, with the non-interactive Agg canvas and the Figure API. The current
+    character sizes and DIMENSIONS are used by every worker
+
+    Args:
+        specs: a list of dicts, each one contains the plot kind {'line', 'hist'} under the 'kind' key (default is
+               'line') and the arguments of get_line_plot or get_hist_plot
+        workers: an int that contains the number of workers. If 0 the plots are rendered in the current process.
+                 Default is 0
+        pool: a string that contains the kind of pool {'thread', 'process'}. Default is 'process'
+
+    Returns:
+        A list that contains, for each spec, the path of the saved figure if the spec contains save_fig, the png
+        bytes of the figure otherwise (None if the dataset is not a matrix)
+
+    Raises:
+        ValueError: an error on the pool kind or on a plot kind
+    """
+    specs = list(specs)
+    if workers <= 0:
+        return [_render_plot(spec) for spec in specs]
+    if pool == C.THREAD:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        chunksize = 1
+    elif pool == C.PROCESS:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=((CS.small_size, CS.medium_size, CS.big_size), dict(DIMENSIONS)),
+        )
+        chunksize = max(1, len(specs) // (workers * 4))
+    else:
+        raise ValueError(C.POOL_ERROR_MSG.format(pool))
+    with executor:
+        return list(executor.map(_render_plot, specs, chunksize=chunksize))
+
+
 update_dimensions()
@@ -1,6 +1,15 @@
 from utils_unibs.constants import C
+from functools import lru_cache
+from statistics import NormalDist
+import csv
+import html
+import io
+import itertools
+import math
+import numbers
 import numpy as np
 import re
+import warnings
 
 
 def get_idxs(position: int, count_vals: int):
@@ -26,6 +35,153 @@ def get_idxs(position: int, count_vals: int):
     return prev_idx, next_idx
 
 
+def _get_best_mask(table: np.ndarray, best: int = -1, axis: int = 0, count_vals: int = -1):
+    """
+    Computes which cells contain the best value of their interval, for the whole table at once.
+
+    Args:
+        table: a 2D ndarray that contains the data
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+
+    Returns:
+        A boolean ndarray with the same shape of table, True for the best values. NaN values are ignored.
+        None if table is not a 2D array.
+    """
+    table = np.asanyarray(table)
+    if table.ndim != 2:
+        return None
+    mask = np.zeros(table.shape, dtype=bool)
+    if best not in (C.MAX, C.MIN) or axis not in (C.COLUMN, C.ROW) or table.size == 0:
+        return mask
+
+    values = table.T if axis == C.ROW else table
+    length = values.shape[0]
+    size = length if count_vals <= 0 else count_vals
+    starts = np.arange(0, length, size)
+
+    if values.dtype.kind in "biuf":
+        reduce = np.fmax if best == C.MAX else np.fmin
+        extremes = reduce.reduceat(values, starts, axis=0)
+        extremes = np.repeat(extremes, np.diff(np.append(starts, length)), axis=0)
+        mask = values == extremes
+    else:
+        function = np.max if best == C.MAX else np.min
+        mask = np.zeros(values.shape, dtype=bool)
+        for start in starts:
+            for j in range(values.shape[1]):
+                window = values[start:start + size, j]
+                try:
+                    mask[start:start + size, j] = window == function(window)
+                except Exception:
+                    pass
+
+    return mask.T if axis == C.ROW else mask
+
+
+def _get_rank_mask(table: np.ndarray, best: int = -1, axis: int = 0, count_vals: int = -1, top: int = 1):
+    """
+    Computes the rank of the top values of each interval, for the whole table at once. Numeric tables are ranked
+    with a single partial sort of all the intervals, so the cost does not depend on the number of ranks.
+    Equal values share the same rank, and the following values skip the shared ranks (e.g. 1, 1, 3).
+
+    Args:
+        table: a 2D ndarray that contains the data
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+        top: an int that contains the number of ranks to compute. Default is 1
+
+    Returns:
+        An int ndarray with the same shape of table, that contains the rank (1 for the best value) of the top
+        values of each interval and 0 for the other values. NaN values are ignored. None if table is not a 2D array.
+    """
+    if top <= 1:
+        mask = _get_best_mask(table, best, axis, count_vals)
+        return None if mask is None else mask.astype(np.int8)
+    table = np.asanyarray(table)
+    if table.ndim != 2:
+        return None
+    ranks = np.zeros(table.shape, dtype=np.int8)
+    if best not in (C.MAX, C.MIN) or axis not in (C.COLUMN, C.ROW) or table.size == 0:
+        return ranks
+
+    values = table.T if axis == C.ROW else table
+    length, width = values.shape
+    size = length if count_vals <= 0 else count_vals
+    top = min(top, size)
+
+    if values.dtype.kind in "biuf":
+        # smaller is better, NaN and padding are never ranked
+        keys = -values.astype(np.float64) if best == C.MAX else values.astype(np.float64)
+        missing = np.isnan(keys)
+        n_windows = -(-length // size)
+        padded = np.full((n_windows * size, width), np.inf)
+        padded[:length] = np.where(missing, np.inf, keys)
+        windows = padded.reshape(n_windows, size, width)
+        tops = np.partition(windows, list(range(top)), axis=1)[:, :top, :]
+        better = (tops[:, None, :, :] < windows[:, :, None, :]).sum(axis=2)
+        ranked = (better + 1).reshape(n_windows * size, width)[:length]
+        ranked[missing | (ranked > top)] = 0
+        ranks = ranked.astype(np.int8)
+    else:
+        ranks = np.zeros(values.shape, dtype=np.int8)
+        descending = bool(best == C.MAX)
+        for start in range(0, length, size):
+            for j in range(width):
+                window = values[start:start + size, j].tolist()
+                try:
+                    ordered = sorted(window, reverse=descending)[:top]
+                    for i, el in enumerate(window):
+                        better = sum(1 for o in ordered if (o > el if descending else o < el))
+                        if better < top and el in ordered:
+                            ranks[start + i, j] = better + 1
+                except Exception:
+                    pass
+
+    return ranks.T if axis == C.ROW else ranks
+
+
+def _apply_style(cell: str, rank: int, styles: tuple) -> str:
+    """
+    Highlights a latex cell with the style of its rank. Ranks after the last style use the last style
+
+    Args:
+        cell: a string that contains the escaped cell
+        rank: an int that contains the rank of the cell (1 for the best value)
+        styles: a tuple of latex commands (e.g. \\bf, \\underline, \\cellcolor{gray!25}), one for each rank
+
+    Returns:
+        A string that contains the highlighted cell
+    """
+    return styles[min(int(rank), len(styles)) - 1] + "{" + cell + "}"
+
+
+_TEX_CONV = {
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\^{}",
+    "\\": r"\textbackslash{}",
+    "<": r"\textless{}",
+    ">": r"\textgreater{}",
+}
+_TEX_REGEX = re.compile(
+    "|".join(
+        re.escape(str(key)) for key in sorted(_TEX_CONV.keys(), key=lambda item: -len(item))
+    )
+)
+
+
+@lru_cache(maxsize=C.FORMAT_CACHE_SIZE)
 def _tex_escape(text):
     """
     Source: https://stackoverflow.com/questions/16259923/how-can-i-escape-latex-special-characters-inside-django-templates
@@ -36,36 +192,308 @@ def _tex_escape(text):
     Returns:
         the message escaped to appear correctly in LaTeX
     """
-    conv = {
-        "&": r"\&",
-        "%": r"\%",
-        "$": r"\$",
-        "#": r"\#",
-        "_": r"\_",
-        "{": r"\{",
-        "}": r"\}",
-        "~": r"\textasciitilde{}",
-        "^": r"\^{}",
-        "\\": r"\textbackslash{}",
-        "<": r"\textless{}",
-        ">": r"\textgreater{}",
-    }
-    regex = re.compile(
-        "|".join(
-            re.escape(str(key))
-            for key in sorted(conv.keys(), key=lambda item: -len(item))
-        )
-    )
-    return regex.sub(lambda match: conv[match.group()], text)
+    return _TEX_REGEX.sub(lambda match: _TEX_CONV[match.group()], text)
 
 
-def _get_formatted_element(el: object, precision: int = 1):
+def _get_formatted_element(el: object, precision: int = 1, escape: bool = True):
     try:
         f = float(el)
         return f"{f:.{precision}f}"
     except ValueError:
         s = str(el)
-        return f"{_tex_escape(s)}"
+        return _tex_escape(s) if escape else s
+
+
+def _get_precision(precision, column: int) -> int:
+    """
+    Returns the float precision of a column
+
+    Args:
+        precision: an int, or a list that contains an int for each column
+        column: the index of the column
+
+    Returns:
+        the float precision of the column
+    """
+    if isinstance(precision, (list, tuple, np.ndarray)):
+        return int(precision[column])
+    return precision
+
+
+def _format_numbers(values: np.ndarray, precision: int) -> np.ndarray:
+    """
+    Formats an array of numbers at once
+
+    Args:
+        values: a ndarray of numbers
+        precision: an int that contains the float precision
+
+    Returns:
+        a ndarray of strings, formatted like f"{value:.{precision}f}"
+    """
+    return np.char.mod(f"%.{precision}f", values.astype(np.float64))
+
+
+def _format_column(values: np.ndarray, precision: int = 1, escape: bool = True) -> list:
+    """
+    Formats a column of a latex table. Numeric columns are formatted at once, the other values are formatted once
+    per distinct value
+
+    Args:
+        values: a 1D ndarray that contains the column
+        precision: an int that contains the float precision
+        escape: True to escape the LaTeX special characters of the text values. Default is True
+
+    Returns:
+        a list of strings, formatted like _get_formatted_element
+    """
+    if values.dtype.kind in "biuf":
+        return _format_numbers(values, precision).tolist()
+    memo = {}
+    formatted = []
+    for el in values.tolist():
+        try:
+            s = memo.get(el)
+            if s is None:
+                s = memo[el] = _get_formatted_element(el, precision, escape)
+        except TypeError:
+            s = _get_formatted_element(el, precision, escape)
+        formatted.append(s)
+    return formatted
+
+
+def _format_table(table: np.ndarray, precision=1) -> list:
+    """
+    Formats all the cells of a latex table, column by column
+
+    Args:
+        table: a ndarray that contains the data divided by rows
+        precision: an int, or a list that contains an int for each column
+
+    Returns:
+        a list that contains, for each row, the list of formatted cells
+    """
+    if table.ndim != 2:
+        return [
+            [_get_formatted_element(el, _get_precision(precision, j)) for j, el in enumerate(r)]
+            for r in table
+        ]
+    columns = [
+        _format_column(table[:, j], _get_precision(precision, j)) for j in range(table.shape[1])
+    ]
+    return [list(r) for r in zip(*columns)] if columns else [[] for _ in range(table.shape[0])]
+
+
+_TEXT_NUMBER_TYPES = frozenset(
+    [float, int] + [np.dtype(code).type for code in np.typecodes["AllInteger"] + np.typecodes["Float"]]
+)
+
+
+def _format_text_value(value, precision: int) -> str:
+    """
+    Formats a cell of a text table. Numbers (Python and NumPy scalars of any precision) are formatted with the
+    given precision, the other values are converted to strings
+
+    Args:
+        value: the value of the cell
+        precision: an int that contains the float precision
+
+    Returns:
+        a string that contains the formatted cell
+    """
+    # the common types are checked before the slower abstract classes
+    kind = type(value)
+    if kind in _TEXT_NUMBER_TYPES:
+        return f"{value:.{precision}f}"
+    if kind is str:
+        return value
+    if isinstance(value, (numbers.Real, np.number)) and not isinstance(value, (bool, np.bool_)):
+        return f"{float(value):.{precision}f}"
+    return str(value)
+
+
+def _format_text_column(column: tuple, precision: int) -> list:
+    """
+    Formats a column of a text table. Columns that contain only numbers or only strings are formatted at once,
+    the other columns a cell at a time
+
+    Args:
+        column: a tuple that contains the values of the column
+        precision: an int that contains the float precision
+
+    Returns:
+        a list of strings, formatted like _format_text_value
+    """
+    types = set(map(type, column))
+    if types <= _TEXT_NUMBER_TYPES:
+        return list(map(f"{{:.{precision}f}}".format, column))
+    if types == {str}:
+        return column
+    return [_format_text_value(value, precision) for value in column]
+
+
+def _format_text_cells(row_cells: list, precision) -> list:
+    """
+    Formats all the cells of a block of rows of a text table, column by column. Blocks with rows of different
+    lengths are formatted a cell at a time
+
+    Args:
+        row_cells: a list that contains the rows of the block
+        precision: an int, or a list that contains an int for each column
+
+    Returns:
+        a list that contains, for each row, the sequence of formatted cells
+    """
+    if any(len(row) != len(row_cells[0]) for row in row_cells):
+        return [
+            [_format_text_value(value, _get_precision(precision, j)) for j, value in enumerate(row)]
+            for row in row_cells
+        ]
+    columns = [
+        _format_text_column(column, _get_precision(precision, j)) for j, column in enumerate(zip(*row_cells))
+    ]
+    return list(zip(*columns)) if columns else [[] for _ in row_cells]
+
+
+def _get_text_widths(headers: list, blocks, precision) -> list:
+    """
+    Computes the width of each column of a text table as the longest header or formatted cell
+
+    Args:
+        headers: a list of string that contains the table headers
+        blocks: an iterable of lists of rows
+        precision: an int, or a list that contains an int for each column
+
+    Returns:
+        a list that contains the width of each column
+    """
+    widths = [len(str(h)) for h in headers]
+    for block in blocks:
+        for cells in _format_text_cells(block, precision):
+            if len(cells) > len(widths):
+                widths += [0] * (len(cells) - len(widths))
+            for j, cell in enumerate(cells):
+                widths[j] = max(widths[j], len(cell))
+    return widths
+
+
+def _iter_chunks(dataset, size: int):
+    """
+    Splits a dataset in chunks of rows. Lists, tuples and arrays are returned as a single chunk, other iterables
+    are consumed size rows at a time
+
+    Args:
+        dataset: a list, an array or an iterable of rows
+        size: an int that contains the number of rows of each chunk. None puts all the rows in a single chunk
+
+    Yields:
+        ndarrays that contain consecutive rows of the dataset
+    """
+    if isinstance(dataset, (list, tuple, np.ndarray)):
+        yield np.asanyarray(dataset)
+        return
+    if size is None:
+        yield np.asanyarray(list(dataset))
+        return
+    chunk = []
+    for row in dataset:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield np.asanyarray(chunk)
+            chunk = []
+    if chunk:
+        yield np.asanyarray(chunk)
+
+
+def iter_latex_table(
+    dataset,
+    labels: list = None,
+    best=-1,
+    axis: int = 0,
+    count_vals: int = -1,
+    precision: int = 1,
+    hline: int = 0,
+    top: int = 1,
+    styles: tuple = C.LATEX_STYLES,
+):
+    """
+    Lazily creates the rows of a latex table of a given dataset. Iterables of rows are consumed in chunks, so only
+    a chunk is kept in memory. When the best value is computed along columns, each chunk contains whole intervals
+    of count_vals rows (all the rows if count_vals is -1).
+
+    Args:
+        dataset: a list, an array or an iterable that contains the data that compose the table divided by rows, or
+                 a columnar dataset (see build_latex_table)
+        labels: the list of labels to put at the beginning of each row. Default is None
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 1
+        hline: an int that contains the number of rows after which to put an horizontal line. Default is 0
+        top: an int that contains the number of best values to highlight in each interval (e.g. 2 for the best and
+             the second best). Default is 1
+        styles: a tuple of latex commands, the i-th one highlights the values of rank i. Ranks after the last style
+                use the last style. Default is (\\bf, \\underline)
+
+    Yields:
+        strings that contain the latex rows of the given dataset, each terminated by a new line
+    """
+    if _get_columns(dataset) is not None:
+        table = build_latex_table(
+            dataset, labels, best, axis, count_vals, precision, hline, top=top, styles=styles
+        )
+        yield from table.iter_latex(header=False)
+        return
+
+    size = C.CHUNK_ROWS
+    if axis == C.COLUMN and best in (C.MAX, C.MIN):
+        size = None if count_vals <= 0 else count_vals * -(-C.CHUNK_ROWS // count_vals)
+
+    i = 0
+    for table in _iter_chunks(dataset, size):
+        ranks = _get_rank_mask(table, best, axis, count_vals, top)
+        for k, r in enumerate(_format_table(table, precision)):
+            try:
+                if labels is not None:
+                    s = _get_formatted_element(labels[i])
+                else:
+                    raise IndexError
+            except IndexError:
+                s = ""
+            s += " & "
+
+            for j, el in enumerate(r):
+                if ranks is not None and ranks[k, j]:
+                    s += _apply_style(el, ranks[k, j], styles) + " & "
+                else:
+                    s += el + " & "
+            s = s[:-2]
+            s += r"\\"
+            if hline > 0 and i % hline == hline - 1:
+                s += r"\hline"
+            yield s + "\n"
+            i += 1
+
+
+def write_latex_table(file, dataset, **kwargs) -> int:
+    """
+    Writes a latex table of a given dataset in a file-like object, one row at a time
+
+    Args:
+        file: a file-like object with a write method
+        dataset: a list, an array or an iterable that contains the data that compose the table divided by rows
+        **kwargs: the other arguments of print_latex_table
+
+    Returns:
+        An int that contains the number of written rows
+    """
+    count = 0
+    for row in iter_latex_table(dataset, **kwargs):
+        file.write(row)
+        count += 1
+    return count
 
 
 def print_latex_table(
@@ -76,6 +504,8 @@ def print_latex_table(
     count_vals: int = -1,
     precision: int = 1,
     hline: int = 0,
+    top: int = 1,
+    styles: tuple = C.LATEX_STYLES,
 ):
     """
     Creates a latex table of a given dataset
@@ -87,70 +517,137 @@ def print_latex_table(
         axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
         count_vals: An integer representing the length of the interval within which to compute the best value.
                     Value -1 represents the whole axis.
-        precision: an int that contains the float precision. Default is 1
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 1
         hline: an int that contains the number of rows after which to put an horizontal line. Default is 0
+        top: an int that contains the number of best values to highlight in each interval (e.g. 2 for the best and
+             the second best). Default is 1
+        styles: a tuple of latex commands, the i-th one highlights the values of rank i. Ranks after the last style
+                use the last style. Default is (\\bf, \\underline)
 
     Returns:
         A string that contains the latex body of the given dataset
     """
-    table = np.asanyarray(dataset)
+    return "".join(
+        iter_latex_table(dataset, labels, best, axis, count_vals, precision, hline, top, styles)
+    )
 
-    max_idxs = []
-    function = ""
-    s = ""
 
-    if best == C.MAX:
-        function = np.max
-    elif best == C.MIN:
-        function = np.min
+def iter_text_table(
+    title: str,
+    headers: list,
+    rows,
+    just: int = 10,
+    precision: int = 2,
+    two_pass: bool = False,
+    repeat_header: int = 0,
+):
+    """
+    Lazily creates the lines of a text table that contains the given rows. Rows are formatted in chunks, so
+    iterators of rows of any length are consumed a chunk at a time
 
-    for i, r in enumerate(table):
+    Args:
+        title: a string that contains the table title
+        headers: a list of string that contains the table headers
+        rows: a list or an iterable that contains the table values
+        just: an int that contains the justification value for each column, None to infer the width of each column
+              from the first chunk of rows (later wider cells are not truncated). Default is 10
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 2
+        two_pass: True to infer the widths from all the rows with a first pass on rows, that must be re-iterable
+                  (e.g. a list or a file). Used only if just is None. Default is False
+        repeat_header: an int that contains the number of rows after which to repeat the headers, 0 to show them
+                       only at the beginning. Default is 0
 
-        try:
-            if labels is not None:
-                s += _get_formatted_element(labels[i])
-            else:
-                raise IndexError
-        except IndexError:
-            pass
-        s += " & "
+    Yields:
+        strings that contain the lines of the table
 
-        for j, el in enumerate(r):
-            try:
-                if best == 0 or best == 1:
-                    if axis == C.COLUMN:
-                        prev_idx, next_idx = get_idxs(i, count_vals)
-                        max_idxs = np.where(
-                            table[:, j] == function(table[prev_idx:next_idx, j])
-                        )[0]
-                    elif axis == C.ROW:
-                        prev_idx, next_idx = get_idxs(j, count_vals)
-                        max_idxs = np.where(
-                            table[i] == function(table[i, prev_idx:next_idx])
-                        )[0]
-            except Exception as e:
-                max_idxs = []
-
-            if (axis == C.COLUMN and i in max_idxs) or (
-                axis == C.ROW and j in max_idxs
-            ):
-                s += r"\bf{"
-            s += _get_formatted_element(el, precision)
-            if (axis == C.COLUMN and i in max_idxs) or (
-                axis == C.ROW and j in max_idxs
-            ):
-                s += "}"
-            s += " & "
-        s = s[:-2]
-        s += r"\\"
-        if hline > 0 and i % hline == hline - 1:
-            s += "\hline"
-        s += "\n"
-    return s
+    Raises:
+        ValueError: an error if two_pass is True and rows is an iterator
+    """
+    iterator = iter(rows)
+    first = []
+    if just is None and two_pass:
+        if iterator is rows:
+            raise ValueError(C.TWO_PASS_ERROR_MSG)
+        widths = _get_text_widths(headers, _iter_blocks(iterator, C.CHUNK_ROWS), precision)
+        iterator = iter(rows)
+    elif just is None:
+        first = next(_iter_blocks(iterator, C.CHUNK_ROWS), [])
+        widths = _get_text_widths(headers, [first], precision)
+    else:
+        widths = [just] * len(headers)
+
+    # a line template for each number of cells, that right-justifies each cell to the width of its column
+    templates = {}
+
+    def get_template(size: int) -> str:
+        template = templates.get(size)
+        if template is None:
+            column_widths = widths[:size] + [just or 0] * (size - len(widths))
+            template = templates[size] = "".join(f"{{:>{w}}}     " for w in column_widths)
+        return template
+
+    divider = "-" * (sum(widths[: len(headers)]) + 5 * len(headers) - 4)
+    header = get_template(len(headers)).format(*map(str, headers))
+    yield title
+    yield divider
+    yield header
+    yield divider
+
+    count = 0
+    for block in itertools.chain([first], _iter_blocks(iterator, C.CHUNK_ROWS)):
+        for cells in _format_text_cells(block, precision):
+            if repeat_header > 0 and count > 0 and count % repeat_header == 0:
+                yield divider
+                yield header
+                yield divider
+            yield get_template(len(cells)).format(*cells)
+            count += 1
+    yield divider
+
+
+def _iter_blocks(iterator, size: int):
+    """
+    Splits an iterator of rows in lists of at most size rows
+
+    Args:
+        iterator: an iterator of rows
+        size: an int that contains the number of rows of each block
+
+    Yields:
+        lists of consecutive rows
+    """
+    while True:
+        block = list(itertools.islice(iterator, size))
+        if not block:
+            return
+        yield block
+
+
+def write_text_table(file, title: str, headers: list, rows, **kwargs) -> int:
+    """
+    Writes a text table in a file-like object, one line at a time
+
+    Args:
+        file: a file-like object with a write method
+        title: a string that contains the table title
+        headers: a list of string that contains the table headers
+        rows: a list or an iterable that contains the table values
+        **kwargs: the other arguments of print_text_table
+
+    Returns:
+        An int that contains the number of written lines
+    """
+    count = 0
+    for line in iter_text_table(title, headers, rows, **kwargs):
+        file.write(line + "\n")
+        count += 1
+    return count
 
 
 def print_text_table(
-    title: str, headers: list, rows: list, just: int = 10, precision: int = 2
+    title: str, headers: list, rows: list, just: int = 10, precision: int = 2, repeat_header: int = 0
 ) -> list:
     """
     Create a text table that contains the given rows
@@ -159,67 +656,1052 @@ def print_text_table(
         title: a string that contains the table title
         headers: a list of string that contains the table headers
         rows: a list that contains the table values
-        just: an int that contains the justification value for each column. Default is 10
-        precision: an int that contains the float precision. Default is 2
+        just: an int that contains the justification value for each column, None to fit each column to its
+              longest cell. Default is 10
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 2
+        repeat_header: an int that contains the number of rows after which to repeat the headers, 0 to show them
+                       only at the beginning. Default is 0
 
     Returns:
         a list of string that contains the rows of the table
     """
-    to_ret = []
-    divider = "-" * ((just + 5) * len(headers) - 4)
-    to_ret.append(title)
-    to_ret.append(divider)
-    s = ""
-    for h in headers:
-        s += f"{str(h).rjust(just)}     "
-    to_ret.append(s)
-    to_ret.append(divider)
-
-    for row in rows:
-        s = ""
-        for value in row:
-            if type(value) == int:
-                s += f"{value:{just}.{precision}f}     "
-            elif type(value) == float or type(value) == np.float64:
-                s += f"{value:{just}.{precision}f}     "
-            elif type(value) == str:
-                s += f"{value.rjust(just)}     "
+    return list(
+        iter_text_table(
+            title, headers, rows, just, precision, two_pass=iter(rows) is not rows, repeat_header=repeat_header
+        )
+    )
+
+
+_CELL_SPLIT_REGEX = re.compile(r"(?<!\\)&")
+_ROW_END_REGEX = re.compile(r"\\\\\s*(\\hline)?\s*$")
+
+
+@lru_cache(maxsize=None)
+def _get_style_regex(style: str):
+    return re.compile("^" + re.escape(style) + r"\{(.*)\}$", re.DOTALL)
+
+
+def _markdown_style(cell: str, rank: int) -> str:
+    if not cell:
+        return cell
+    return f"**{cell}**" if rank == 1 else f"*{cell}*"
+
+
+class Table:
+    """
+    Class for handling a table in memory. Cells are stored by column, keeping the type of each column, together with
+    the highlighting of the best values and the positions of the horizontal lines. Transposing, slicing and
+    reordering return views that share the data, and the cells are formatted once and rendered only at the end,
+    in LaTeX, text, Markdown, CSV or HTML.
+
+    Attributes:
+        shape: a tuple (rows, columns) of the table
+        labels: the list of labels at the beginning of each row, None if the table has no labels column
+        headers: the list of headers of the columns, None if the table has no headers row
+    """
+
+    def __init__(
+        self,
+        columns: list,
+        labels: list = None,
+        headers: list = None,
+        highlight: np.ndarray = None,
+        hlines: np.ndarray = None,
+        precision=1,
+        latex: bool = False,
+        styles: tuple = C.LATEX_STYLES,
+    ):
+        """
+        Args:
+            columns: a list of 1D arrays, one for each column. They are not copied
+            labels: the list of labels at the beginning of each row. Default is None
+            headers: the list of headers of the columns. Default is None
+            highlight: a 2D array that contains the rank of the cells to highlight (1 for the best value) and 0 for
+                       the other cells. A boolean array highlights the True cells as best values. Default is None
+            hlines: a boolean array, True for the rows followed by an horizontal line. Default is None
+            precision: an int that contains the float precision, or a list with the precision of each column.
+                       Default is 1
+            latex: True if cells, labels and headers are already formatted in LaTeX. Default is False
+            styles: a tuple of latex commands, the i-th one highlights the cells of rank i. Default is
+                    (\\bf, \\underline)
+        """
+        self._columns = [np.asanyarray(c) for c in columns]
+        n_rows = len(self._columns[0]) if self._columns else len(labels or [])
+        n_cols = len(self._columns)
+        self._labels = None if labels is None else list(labels)
+        self._headers = None if headers is None else list(headers)
+        self._highlight = (
+            np.zeros((n_rows, n_cols), dtype=np.int8)
+            if highlight is None
+            else np.asarray(highlight).astype(np.int8)
+        )
+        self._hlines = np.zeros(n_rows, dtype=bool) if hlines is None else np.asarray(hlines)
+        self._precision = precision
+        self._latex = latex
+        self._styles = tuple(styles)
+        self._cache = {}
+        self._rows = np.arange(n_rows)
+        self._cols = np.arange(n_cols)
+        self._transposed = False
+
+    def _view(self, rows: np.ndarray, cols: np.ndarray, transposed: bool):
+        """
+        Creates a view of the table that shares the data and the formatted cells
+
+        Args:
+            rows: the indexes of the stored rows in the view
+            cols: the indexes of the stored columns in the view
+            transposed: True if the stored rows are shown as columns
+
+        Returns:
+            a Table
+        """
+        view = type(self).__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view._rows = rows
+        view._cols = cols
+        view._transposed = transposed
+        return view
+
+    @property
+    def shape(self):
+        if self._transposed:
+            return len(self._cols), len(self._rows)
+        return len(self._rows), len(self._cols)
+
+    @property
+    def labels(self):
+        names = self._headers if self._transposed else self._labels
+        idxs = self._cols if self._transposed else self._rows
+        return None if names is None else [names[i] for i in idxs]
+
+    @property
+    def headers(self):
+        names = self._labels if self._transposed else self._headers
+        idxs = self._rows if self._transposed else self._cols
+        return None if names is None else [names[i] for i in idxs]
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def transpose(self):
+        """
+        Returns the transposed view of the table. Horizontal lines are not kept
+
+        Returns:
+            a Table
+        """
+        return self._view(self._rows, self._cols, not self._transposed)
+
+    def __getitem__(self, item):
+        """
+        Returns a view that contains the selected rows and columns
+
+        Args:
+            item: a row selection or a (rows, columns) tuple. Selections can be ints, slices or lists of indexes
+
+        Returns:
+            a Table
+        """
+        rows, cols = item if isinstance(item, tuple) else (item, slice(None))
+        if isinstance(rows, (int, np.integer)):
+            rows = [rows]
+        if isinstance(cols, (int, np.integer)):
+            cols = [cols]
+        if self._transposed:
+            return self._view(self._rows[cols], self._cols[rows], True)
+        return self._view(self._rows[rows], self._cols[cols], False)
+
+    def reorder(self, rows: list = None, columns: list = None):
+        """
+        Returns a view with the rows and columns in the given order
+
+        Args:
+            rows: a list of row indexes. None keeps all the rows. Default is None
+            columns: a list of column indexes. None keeps all the columns. Default is None
+
+        Returns:
+            a Table
+        """
+        return self[
+            slice(None) if rows is None else list(rows),
+            slice(None) if columns is None else list(columns),
+        ]
+
+    def _get_formatted(self) -> list:
+        """
+        Formats the stored cells as plain text, once for all the views and the output formats
+
+        Returns:
+            a list that contains, for each stored column, the list of formatted cells
+        """
+        if "formatted" not in self._cache:
+            if self._latex:
+                self._cache["formatted"] = [[str(el) for el in c.tolist()] for c in self._columns]
             else:
-                print(f"Could not parse type {type(value)}")
-        to_ret.append(s)
-    to_ret.append(divider)
-    return to_ret
+                self._cache["formatted"] = [
+                    _format_column(c, _get_precision(self._precision, j), escape=False)
+                    for j, c in enumerate(self._columns)
+                ]
+        return self._cache["formatted"]
+
+    def _format_name(self, name: object) -> str:
+        return str(name) if self._latex else _get_formatted_element(name, escape=False)
+
+    def _escape(self, text: str) -> str:
+        return text if self._latex else _tex_escape(text)
+
+    def iter_rows(self):
+        """
+        Yields the rows of the view
+
+        Yields:
+            tuples (label, formatted cells, ranks of the highlighted cells, horizontal line)
+        """
+        formatted = self._get_formatted()
+        labels = self.labels
+        for r in range(self.shape[0]):
+            if self._transposed:
+                c = self._cols[r]
+                cells = [formatted[c][i] for i in self._rows]
+                highlight = self._highlight[self._rows, c]
+                hline = False
+            else:
+                i = self._rows[r]
+                cells = [formatted[c][i] for c in self._cols]
+                highlight = self._highlight[i, self._cols]
+                hline = bool(self._hlines[i])
+            yield (None if labels is None else labels[r]), cells, highlight, hline
+
+    def _iter_lines(self, escape=None, style=None):
+        """
+        Yields the header and the rows of the view, escaped and styled for an output format
+
+        Args:
+            escape: a function escape(text) for the special characters of the output format. Default is None
+            style: a function style(text, rank) that returns the highlighted version of an escaped cell. Default is
+                   None
+
+        Yields:
+            tuples (list of cells, True if the line is the header, horizontal line)
+        """
+        escape = escape or (lambda c: c)
+        style = style or (lambda c, r: c)
+        labels = self.labels
+        if self.headers is not None:
+            corner = [""] if labels is not None else []
+            yield [escape(self._format_name(h)) for h in corner + self.headers], True, False
+        for label, cells, highlight, hline in self.iter_rows():
+            cells = [style(escape(c), h) if h else escape(c) for c, h in zip(cells, highlight)]
+            if labels is not None:
+                cells = [escape(self._format_name(label))] + cells
+            yield cells, False, hline
+
+    def iter_latex(self, header: bool = True):
+        """
+        Lazily renders the rows of the table in LaTeX, like iter_latex_table
+
+        Args:
+            header: False to skip the row of the headers. Default is True
+
+        Yields:
+            strings that contain the latex rows of the table, each terminated by a new line
+        """
+        for cells, is_header, hline in self._iter_lines(self._escape, lambda c, r: _apply_style(c, r, self._styles)):
+            if is_header and not header:
+                continue
+            yield " & ".join(cells) + r" \\" + (r"\hline" if hline else "") + "\n"
+
+    def to_latex(self, booktabs: bool = False) -> str:
+        """
+        Renders the table in LaTeX
+
+        Args:
+            booktabs: False to render the rows like print_latex_table, True to render the headers (or the first row)
+                      between toprule and midrule and to end the table with bottomrule. Default is False
+
+        Returns:
+            A string that contains the latex table
+        """
+        if not booktabs:
+            return "".join(self.iter_latex())
+        s = ""
+        lines = self._iter_lines(self._escape, lambda c, r: _apply_style(c, r, self._styles))
+        for i, (cells, _, _) in enumerate(lines):
+            line = " & ".join(cells)
+            if i == 0:
+                s += "\\toprule\n"
+            elif i == 1:
+                s += "\\midrule\n"
+            s += line + " \\\\ \n"
+        return s + r"\bottomrule"
+
+    def to_text(self, title: str = "", just: int = 10) -> list:
+        """
+        Renders the table as text, with the same layout of print_text_table. Highlighted cells end with one * for
+        each rank (* for the best value, ** for the second best)
+
+        Args:
+            title: a string that contains the table title. Default is ''
+            just: an int that contains the justification value for each column. Default is 10
+
+        Returns:
+            a list of string that contains the lines of the table
+        """
+        n_cols = self.shape[1] + (1 if self.labels is not None else 0)
+        divider = "-" * ((just + 5) * n_cols - 4)
+        lines = [title, divider]
+        for cells, header, _ in self._iter_lines(style=lambda c, r: c + "*" * int(r)):
+            lines.append("".join(f"{c.rjust(just)}     " for c in cells))
+            if header:
+                lines.append(divider)
+        lines.append(divider)
+        return lines
+
+    def to_markdown(self) -> str:
+        """
+        Renders the table in Markdown. The best values are bold, the other highlighted cells are italic
+
+        Returns:
+            A string that contains the markdown table
+        """
+        s = ""
+        lines = self._iter_lines(lambda c: c.replace("|", "\\|"), _markdown_style)
+        n_cols = self.shape[1] + (1 if self.labels is not None else 0)
+        if self.headers is None:
+            s += "|" + " |" * n_cols + "\n"
+            s += "|" + "---|" * n_cols + "\n"
+        for cells, header, _ in lines:
+            s += "| " + " | ".join(cells) + " |\n"
+            if header:
+                s += "|" + "---|" * n_cols + "\n"
+        return s
+
+    def to_csv(self) -> str:
+        """
+        Renders the table in CSV. Highlighting is not kept
+
+        Returns:
+            A string that contains the csv table
+        """
+        f = io.StringIO()
+        writer = csv.writer(f, lineterminator="\n")
+        for cells, _, _ in self._iter_lines():
+            writer.writerow(cells)
+        return f.getvalue()
+
+    def to_html(self) -> str:
+        """
+        Renders the table in HTML. The best values are bold, the other highlighted cells are underlined and
+        horizontal lines are rendered as row borders
+
+        Returns:
+            A string that contains the html table
+        """
+        has_labels = self.labels is not None
+        s = "<table>\n"
+        body = False
+        for cells, header, hline in self._iter_lines(html.escape, lambda c, r: f"<b>{c}</b>" if r == 1 else f"<u>{c}</u>"):
+            if header:
+                s += "<thead>\n<tr>" + "".join(f"<th>{c}</th>" for c in cells) + "</tr>\n</thead>\n"
+                continue
+            if not body:
+                s += "<tbody>\n"
+                body = True
+            s += '<tr style="border-bottom: 1px solid">' if hline else "<tr>"
+            for k, c in enumerate(cells):
+                s += f"<th>{c}</th>" if has_labels and k == 0 else f"<td>{c}</td>"
+            s += "</tr>\n"
+        if body:
+            s += "</tbody>\n"
+        return s + "</table>"
+
+    def export(self, formats: list = None, **kwargs) -> dict:
+        """
+        Renders the table in several formats, formatting the cells only once
+
+        Args:
+            formats: a list of formats {'latex', 'text', 'markdown', 'csv', 'html'}. None renders all the formats.
+                     Default is None
+            **kwargs: the arguments of to_text (title, just)
+
+        Returns:
+            A dict that maps each format to the rendered table
+
+        Raises:
+            ValueError: an error on the format
+        """
+        renderers = {
+            C.LATEX_TABLE: self.to_latex,
+            C.TEXT_TABLE: lambda: self.to_text(**kwargs),
+            C.MARKDOWN_TABLE: self.to_markdown,
+            C.CSV_TABLE: self.to_csv,
+            C.HTML_TABLE: self.to_html,
+        }
+        exported = {}
+        for f in renderers if formats is None else formats:
+            if f not in renderers:
+                raise ValueError(C.TABLE_FORMAT_ERROR_MSG.format(f))
+            exported[f] = renderers[f]()
+        return exported
+
+    @classmethod
+    def from_latex(cls, table_string: str, styles: tuple = C.LATEX_STYLES):
+        """
+        Parses the rows of a latex table. Escaped \\& are kept in the cells, cells wrapped in one of the styles are
+        highlighted with its rank and \\hline are kept. Lines without cells (e.g. \\toprule) are ignored
+
+        Args:
+            table_string: a string that contains a latex table
+            styles: a tuple of latex commands, the i-th one highlights the cells of rank i. Default is
+                    (\\bf, \\underline)
+
+        Returns:
+            a Table without labels, whose cells are the LaTeX strings of the table
+        """
+        regexes = [_get_style_regex(style) for style in styles]
+        rows = []
+        highlight = []
+        hlines = []
+        for line in table_string.split("\n"):
+            elements = _CELL_SPLIT_REGEX.split(line)
+            if len(elements) < 2:
+                continue
+            match = _ROW_END_REGEX.search(elements[-1])
+            hlines.append(match is not None and match.group(1) is not None)
+            if match is not None:
+                elements[-1] = elements[-1][: match.start()]
+            cells = []
+            for e in elements:
+                e = e.strip()
+                rank = 0
+                for k, regex in enumerate(regexes):
+                    styled = regex.match(e)
+                    if styled is not None:
+                        e, rank = styled.group(1), k + 1
+                        break
+                cells.append(e)
+                highlight.append(rank)
+            rows.append(cells)
+        n_cols = max((len(r) for r in rows), default=0)
+        columns = [np.array([r[j] if j < len(r) else "" for r in rows], dtype=object) for j in range(n_cols)]
+        mask = np.zeros((len(rows), n_cols), dtype=np.int8)
+        k = 0
+        for i, r in enumerate(rows):
+            mask[i, : len(r)] = highlight[k : k + len(r)]
+            k += len(r)
+        return cls(columns, highlight=mask, hlines=np.array(hlines, dtype=bool), latex=True, styles=styles)
+
+
+def _get_columns(dataset) -> tuple:
+    """
+    Extracts the typed columns of a columnar dataset without copying them
+
+    Args:
+        dataset: a dict of columns, a numpy structured array, a pandas DataFrame or a pyarrow Table
+
+    Returns:
+        A tuple (list of 1D arrays, list of column names), None if dataset is not columnar
+    """
+    if isinstance(dataset, dict):
+        return [np.asanyarray(c) for c in dataset.values()], list(dataset.keys())
+    if isinstance(dataset, np.ndarray) and dataset.dtype.names is not None:
+        return [dataset[name] for name in dataset.dtype.names], list(dataset.dtype.names)
+    module = type(dataset).__module__
+    if module.startswith("pandas") and hasattr(dataset, "columns"):
+        return [dataset[c].to_numpy() for c in dataset.columns], [str(c) for c in dataset.columns]
+    if module.startswith("pyarrow") and hasattr(dataset, "column_names"):
+        return [c.to_numpy() for c in dataset.columns], list(dataset.column_names)
+    return None
+
+
+def _get_columns_mask(
+    columns: list, best: int = -1, axis: int = 0, count_vals: int = -1, top: int = 1
+) -> np.ndarray:
+    """
+    Computes the rank of the top values of each interval, considering only the numeric columns. Along rows,
+    the intervals contain count_vals numeric columns and the text columns are skipped
+
+    Args:
+        columns: a list of 1D arrays
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+        top: an int that contains the number of ranks to compute. Default is 1
+
+    Returns:
+        An int ndarray of shape (rows, columns), that contains the rank of the top values (1 for the best value)
+        and 0 for the other values
+    """
+    n_rows = len(columns[0]) if columns else 0
+    mask = np.zeros((n_rows, len(columns)), dtype=np.int8)
+    numeric = [j for j, c in enumerate(columns) if c.dtype.kind in "biuf"]
+    if best not in (C.MAX, C.MIN) or n_rows == 0 or not numeric:
+        return mask
+
+    if axis == C.COLUMN:
+        for j in numeric:
+            mask[:, j] = _get_rank_mask(columns[j][:, None], best, C.COLUMN, count_vals, top)[:, 0]
+    elif axis == C.ROW and top > 1:
+        size = len(numeric) if count_vals <= 0 else count_vals
+        for start in range(0, len(numeric), size):
+            window = numeric[start:start + size]
+            values = np.stack([columns[j] for j in window], axis=1)
+            mask[:, window] = _get_rank_mask(values, best, C.ROW, -1, top)
+    elif axis == C.ROW:
+        reduce = np.fmax if best == C.MAX else np.fmin
+        size = len(numeric) if count_vals <= 0 else count_vals
+        for start in range(0, len(numeric), size):
+            window = numeric[start:start + size]
+            extremes = columns[window[0]]
+            for j in window[1:]:
+                extremes = reduce(extremes, columns[j])
+            for j in window:
+                mask[:, j] = columns[j] == extremes
+    return mask
+
+
+def build_latex_table(
+    dataset,
+    labels: list = None,
+    best=-1,
+    axis: int = 0,
+    count_vals: int = -1,
+    precision=1,
+    hline: int = 0,
+    headers: list = None,
+    top: int = 1,
+    styles: tuple = C.LATEX_STYLES,
+) -> Table:
+    """
+    Creates a Table of a given dataset, with the same arguments of print_latex_table. table.to_latex() returns the
+    same string of print_latex_table. Columnar datasets (dict of columns, numpy structured arrays, pandas and
+    pyarrow tables) keep the type of each column, their numeric columns are not copied and the best values are
+    computed only on the numeric columns
+
+    Args:
+        dataset: a list or an array that contains the data that compose the table divided by rows, or a columnar
+                 dataset
+        labels: the list of labels to put at the beginning of each row. Default is None
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 1
+        hline: an int that contains the number of rows after which to put an horizontal line. Default is 0
+        headers: the list of headers of the columns. Default is None (the column names of columnar datasets)
+        top: an int that contains the number of best values to highlight in each interval. Default is 1
+        styles: a tuple of latex commands, the i-th one highlights the values of rank i. Default is
+                (\\bf, \\underline)
+
+    Returns:
+        a Table
+    """
+    columnar = _get_columns(dataset)
+    if columnar is not None:
+        columns, names = columnar
+        mask = _get_columns_mask(columns, best, axis, count_vals, top)
+        if headers is None:
+            headers = names
+    else:
+        table = np.asanyarray(dataset)
+        if table.ndim == 1 and table.size == 0:
+            table = table.reshape(0, 0)
+        columns = [table[:, j] for j in range(table.shape[1])]
+        mask = _get_rank_mask(table, best, axis, count_vals, top)
+    n_rows = len(columns[0]) if columns else 0
+    row_labels = []
+    for i in range(n_rows):
+        try:
+            if labels is None:
+                raise IndexError
+            row_labels.append(labels[i])
+        except IndexError:
+            row_labels.append("")
+    hlines = np.zeros(n_rows, dtype=bool)
+    if hline > 0:
+        hlines[hline - 1 :: hline] = True
+    return Table(
+        columns,
+        labels=row_labels,
+        headers=headers,
+        highlight=mask,
+        hlines=hlines,
+        precision=precision,
+        styles=styles,
+    )
+
+
+def _get_runs(runs) -> np.ndarray:
+    """
+    Arranges the runs of each cell in a 3D array. Ragged runs are padded with NaN in a single assignment
+
+    Args:
+        runs: a 3D array (rows x columns x runs), or a list of rows that contain a list of runs for each column
+
+    Returns:
+        a float ndarray of shape (rows, columns, runs)
+    """
+    if isinstance(runs, np.ndarray) and runs.ndim == 3 and runs.dtype.kind in "biuf":
+        return runs.astype(np.float64, copy=False)
+    rows = [list(r) for r in runs]
+    n_rows = len(rows)
+    n_cols = max((len(r) for r in rows), default=0)
+    cells = [
+        np.asarray(rows[i][j] if j < len(rows[i]) else [], dtype=np.float64).ravel()
+        for i in range(n_rows)
+        for j in range(n_cols)
+    ]
+    lengths = np.array([len(c) for c in cells], dtype=np.int64)
+    padded = np.full((n_rows * n_cols, lengths.max(initial=0)), np.nan)
+    padded[np.arange(padded.shape[1]) < lengths[:, None]] = np.concatenate(cells) if cells else []
+    return padded.reshape(n_rows, n_cols, -1)
+
+
+def _t_coverage(theta: float, df: int) -> float:
+    """
+    Computes the probability that a Student's t variable with df degrees of freedom falls in [-t, t], where
+    t = sqrt(df) * tan(theta), with the closed form for integer df (Abramowitz and Stegun 26.7.3-4)
+
+    Args:
+        theta: a float in [0, pi / 2]
+        df: an int that contains the degrees of freedom
+
+    Returns:
+        a float that contains the probability
+    """
+    cos2 = math.cos(theta) ** 2
+    if df % 2 == 0:
+        term = total = 1.0
+        for k in range(1, df // 2):
+            term *= cos2 * (2 * k - 1) / (2 * k)
+            total += term
+        return math.sin(theta) * total
+    if df == 1:
+        return 2 * theta / math.pi
+    term = total = math.cos(theta)
+    for k in range(1, (df - 1) // 2):
+        term *= cos2 * (2 * k) / (2 * k + 1)
+        total += term
+    return 2 / math.pi * (theta + math.sin(theta) * total)
+
+
+def _t_quantile(confidence: float, df: int) -> float:
+    """
+    Computes the half width, in standard errors, of the confidence interval of a Student's t variable with df
+    degrees of freedom, inverting its closed form distribution by bisection. Many degrees of freedom use the
+    Cornish-Fisher expansion (Abramowitz and Stegun 26.7.5), whose error is negligible there
+
+    Args:
+        confidence: a float that contains the confidence level
+        df: an int that contains the degrees of freedom
+
+    Returns:
+        a float t such that P(-t <= T <= t) = confidence
+    """
+    if df > 1000:
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        g = [
+            (z**3 + z) / 4,
+            (5 * z**5 + 16 * z**3 + 3 * z) / 96,
+            (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / 384,
+            (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z) / 92160,
+        ]
+        return z + sum(g_k / df ** (k + 1) for k, g_k in enumerate(g))
+    low, high = 0.0, math.pi / 2
+    for _ in range(60):
+        theta = (low + high) / 2
+        if _t_coverage(theta, df) < confidence:
+            low = theta
+        else:
+            high = theta
+    return math.sqrt(df) * math.tan((low + high) / 2)
+
+
+def aggregate_runs(runs, confidence: float = C.CONFIDENCE) -> dict:
+    """
+    Computes the statistics of the runs of each cell, at once along the runs axis. NaN runs are ignored
+
+    Args:
+        runs: a 3D array (rows x columns x runs), or a list of rows that contain a list of runs for each column
+              (the number of runs can change from cell to cell)
+        confidence: a float that contains the confidence level of the intervals. Default is 0.95
+
+    Returns:
+        A dict that maps mean, median, std (sample standard deviation), ci (half width of the Student's t
+        confidence interval of the mean, 0 for single runs) and count to a ndarray of shape (rows, columns)
+    """
+    values = _get_runs(runs)
+    count = np.sum(~np.isnan(values), axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=2)
+        median = np.nanmedian(values, axis=2)
+        std = np.where(count > 1, np.nanstd(values, axis=2, ddof=1), 0.0)
+        # the quantile depends on the number of runs, so it is computed once for each distinct count
+        quantiles = np.zeros(count.max(initial=0) + 1)
+        for n in np.unique(count[count > 1]).tolist():
+            quantiles[n] = _t_quantile(confidence, n - 1)
+        ci = np.where(count > 0, quantiles[count] * std / np.sqrt(count), np.nan)
+    return {C.MEAN: mean, C.MEDIAN: median, C.STD: std, C.CI: ci, C.COUNT: count}
+
+
+class _AggregateTable(Table):
+    """
+    Table whose cells are center ± spread. In LaTeX the ± of the cells is rendered as $\\pm$
+    """
+
+    def _iter_lines(self, escape=None, style=None):
+        first = 1 if self.labels is not None else 0
+        for cells, is_header, hline in super()._iter_lines(escape, style):
+            if escape == self._escape and not is_header:
+                cells = cells[:first] + [c.replace("±", r"$\pm$") for c in cells[first:]]
+            yield cells, is_header, hline
+
+
+def build_aggregate_table(
+    runs,
+    labels: list = None,
+    best=-1,
+    axis: int = 0,
+    count_vals: int = -1,
+    precision=1,
+    hline: int = 0,
+    headers: list = None,
+    top: int = 1,
+    styles: tuple = C.LATEX_STYLES,
+    center: str = C.MEAN,
+    spread: str = C.STD,
+    confidence: float = C.CONFIDENCE,
+) -> Table:
+    """
+    Creates a Table whose cells summarize the runs of each configuration as center ± spread (e.g. mean ± std).
+    The best values are computed on the centers
+
+    Args:
+        runs: a 3D array (rows x columns x runs), or a list of rows that contain a list of runs for each column
+        labels: the list of labels to put at the beginning of each row. Default is None
+        best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+        axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+        count_vals: An integer representing the length of the interval within which to compute the best value.
+                    Value -1 represents the whole axis.
+        precision: an int that contains the float precision, or a list with the precision of each column.
+                   Default is 1
+        hline: an int that contains the number of rows after which to put an horizontal line. Default is 0
+        headers: the list of headers of the columns. Default is None
+        top: an int that contains the number of best values to highlight in each interval. Default is 1
+        styles: a tuple of latex commands, the i-th one highlights the values of rank i. Default is
+                (\\bf, \\underline)
+        center: the statistic of the cells {'mean', 'median'}. Default is 'mean'
+        spread: the statistic after ± {'std', 'ci'}, None to render only the center. Default is 'std'
+        confidence: a float that contains the confidence level of the intervals. Default is 0.95
+
+    Returns:
+        a Table
+
+    Raises:
+        ValueError: an error on the center or on the spread
+    """
+    if center not in (C.MEAN, C.MEDIAN):
+        raise ValueError(C.STATISTIC_ERROR_MSG.format(center))
+    if spread not in (C.STD, C.CI, None):
+        raise ValueError(C.STATISTIC_ERROR_MSG.format(spread))
+    stats = aggregate_runs(runs, confidence)
+    centers = stats[center]
+    columns = []
+    for j in range(centers.shape[1]):
+        p = _get_precision(precision, j)
+        cells = _format_numbers(centers[:, j], p)
+        if spread is not None:
+            cells = np.char.add(np.char.add(cells, " ± "), _format_numbers(stats[spread][:, j], p))
+        columns.append(cells)
+    table = build_latex_table(
+        centers, labels, best, axis, count_vals, precision, hline, headers, top, styles
+    )
+    return _AggregateTable(
+        columns,
+        labels=table.labels,
+        headers=headers,
+        highlight=table._highlight,
+        hlines=table._hlines,
+        precision=precision,
+        styles=styles,
+    )
+
+
+def print_aggregate_table(runs, labels: list = None, **kwargs) -> str:
+    """
+    Creates a latex table whose cells summarize the runs of each configuration as mean ± std, like
+    print_latex_table
+
+    Args:
+        runs: a 3D array (rows x columns x runs), or a list of rows that contain a list of runs for each column
+        labels: the list of labels to put at the beginning of each row. Default is None
+        **kwargs: the other arguments of build_aggregate_table
+
+    Returns:
+        A string that contains the latex body of the table
+    """
+    return "".join(build_aggregate_table(runs, labels, **kwargs).iter_latex(header=False))
+
+
+class LiveTable:
+    """
+    Class for handling a latex table that changes while it is rendered (e.g. a progress table of a sweep).
+    Appending or updating rows, columns and cells recomputes only the count_vals intervals (see get_idxs) that
+    contain the changed cells and renders again only the rows whose cells or highlighting changed.
+    to_latex() returns the same string of print_latex_table on the current values.
+
+    Attributes:
+        shape: a tuple (rows, columns) of the table
+    """
+
+    def __init__(
+        self,
+        headers: list = None,
+        best=-1,
+        axis: int = 0,
+        count_vals: int = -1,
+        precision=1,
+        hline: int = 0,
+        top: int = 1,
+        styles: tuple = C.LATEX_STYLES,
+    ):
+        """
+        Args:
+            headers: the list of headers of the columns, used by to_table. Default is None
+            best: an integer representing the best value to highlight {-1: None, 0: Max, 1: Min}
+            axis: An integer representing the axis along which to compute the best value {0: COLUMN, 1: ROW}
+            count_vals: An integer representing the length of the interval within which to compute the best value.
+                        Value -1 represents the whole axis.
+            precision: an int that contains the float precision, or a list with the precision of each column.
+                       Default is 1
+            hline: an int that contains the number of rows after which to put an horizontal line. Default is 0
+            top: an int that contains the number of best values to highlight in each interval. Default is 1
+            styles: a tuple of latex commands, the i-th one highlights the values of rank i. Default is
+                    (\\bf, \\underline)
+        """
+        self._headers = None if headers is None else list(headers)
+        self._best = best
+        self._axis = axis
+        self._count_vals = count_vals
+        self._precision = precision
+        self._hline = hline
+        self._top = top
+        self._styles = tuple(styles)
+        self._values = []
+        self._labels = []
+        self._cells = []
+        self._ranks = []
+        self._lines = []
+
+    @property
+    def shape(self) -> tuple:
+        return len(self._values), len(self._values[0]) if self._values else len(self._headers or [])
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _get_windows(self, changed: set) -> set:
+        """
+        Finds the intervals that contain the changed cells
+
+        Args:
+            changed: a set of (row, column) tuples
+
+        Returns:
+            a set of tuples (line, start, end): the column (for COLUMN) or the row (for ROW) of the interval and its
+            bounds along the axis
+        """
+        windows = set()
+        for i, j in changed:
+            if self._axis == C.COLUMN:
+                start, end = get_idxs(i, self._count_vals)
+                windows.add((j, start, min(end, len(self._values))))
+            elif self._axis == C.ROW:
+                start, end = get_idxs(j, self._count_vals)
+                windows.add((i, start, min(end, len(self._values[i]))))
+        return windows
+
+    def _refresh(self, changed: set) -> list:
+        """
+        Recomputes the highlighting of the intervals that contain the changed cells and renders the affected rows
+
+        Args:
+            changed: a set of (row, column) tuples
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        dirty = {i for i, _ in changed}
+        for i, j in changed:
+            self._cells[i][j] = _get_formatted_element(self._values[i][j], _get_precision(self._precision, j))
+        if self._best in (C.MAX, C.MIN):
+            for line, start, end in self._get_windows(changed):
+                if self._axis == C.COLUMN:
+                    positions = [(i, line) for i in range(start, end)]
+                    window = np.asanyarray([self._values[i][line] for i in range(start, end)])[:, None]
+                else:
+                    positions = [(line, j) for j in range(start, end)]
+                    window = np.asanyarray(self._values[line][start:end])[None, :]
+                ranks = _get_rank_mask(window, self._best, self._axis, -1, self._top).ravel()
+                for (i, j), rank in zip(positions, ranks.tolist()):
+                    if self._ranks[i][j] != rank:
+                        self._ranks[i][j] = rank
+                        dirty.add(i)
+        for i in dirty:
+            self._lines[i] = self._render(i)
+        return sorted(dirty)
+
+    def _render(self, i: int) -> str:
+        cells = [
+            _apply_style(c, r, self._styles) if r else c for c, r in zip(self._cells[i], self._ranks[i])
+        ]
+        s = _get_formatted_element(self._labels[i]) + " & " + " & ".join(cells) + r" \\"
+        if self._hline > 0 and i % self._hline == self._hline - 1:
+            s += r"\hline"
+        return s + "\n"
+
+    def append_row(self, row: list, label: object = "") -> list:
+        """
+        Appends a row at the end of the table
+
+        Args:
+            row: a list that contains the values of the row
+            label: the label to put at the beginning of the row. Default is ''
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        i = len(self._values)
+        self._values.append(list(row))
+        self._labels.append(label)
+        self._cells.append([""] * len(row))
+        self._ranks.append([0] * len(row))
+        self._lines.append("")
+        return self._refresh({(i, j) for j in range(len(row))})
+
+    def update_row(self, i: int, row: list, label: object = None) -> list:
+        """
+        Replaces the values of a row
+
+        Args:
+            i: the index of the row
+            row: a list that contains the new values of the row
+            label: the new label of the row, None to keep the current one. Default is None
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        self._values[i] = list(row)
+        if label is not None:
+            self._labels[i] = label
+        return self._refresh({(i, j) for j in range(len(row))})
+
+    def update_cell(self, i: int, j: int, value: object) -> list:
+        """
+        Replaces the value of a cell
+
+        Args:
+            i: the index of the row
+            j: the index of the column
+            value: the new value of the cell
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        self._values[i][j] = value
+        return self._refresh({(i, j)})
+
+    def append_column(self, column: list, header: object = None) -> list:
+        """
+        Appends a column at the end of the table
+
+        Args:
+            column: a list that contains a value for each row
+            header: the header of the column, used by to_table. Default is None
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        j = self.shape[1]
+        for i, value in enumerate(column):
+            self._values[i].append(value)
+            self._cells[i].append("")
+            self._ranks[i].append(0)
+        if self._headers is not None:
+            self._headers.append("" if header is None else header)
+        return self._refresh({(i, j) for i in range(len(column))})
+
+    def update_column(self, j: int, column: list) -> list:
+        """
+        Replaces the values of a column
+
+        Args:
+            j: the index of the column
+            column: a list that contains the new value of each row
+
+        Returns:
+            the sorted list of the rows whose latex line changed
+        """
+        for i, value in enumerate(column):
+            self._values[i][j] = value
+        return self._refresh({(i, j) for i in range(len(column))})
+
+    def line(self, i: int) -> str:
+        """
+        Returns the latex line of a row, without rendering it again
+
+        Args:
+            i: the index of the row
+
+        Returns:
+            A string that contains the latex row, terminated by a new line
+        """
+        return self._lines[i]
+
+    def to_latex(self) -> str:
+        """
+        Returns the latex body of the table, joining the rendered rows
+
+        Returns:
+            A string that contains the latex body of the table
+        """
+        return "".join(self._lines)
+
+    def to_table(self) -> Table:
+        """
+        Creates a Table of the current values, e.g. to export the table in other formats
+
+        Returns:
+            a Table
+        """
+        columns = [np.asanyarray([row[j] for row in self._values]) for j in range(self.shape[1])]
+        return Table(
+            columns,
+            labels=self._labels,
+            headers=self._headers,
+            highlight=np.array(self._ranks, dtype=np.int8).reshape(self.shape),
+            hlines=np.array([line.endswith("\\hline\n") for line in self._lines], dtype=bool),
+            precision=self._precision,
+            styles=self._styles,
+        )
 
 
-def transpose_latex_table(table_string: str):
+def transpose_latex_table(table_string):
     """
     Transpose a latex table
 
     Args:
-        table_string (str): A latex table
+        table_string (str): A latex table, or a Table
 
     Returns:
         str: The transposed table
     """
-    data = []
-    to_return = ""
-
-    lines = table_string.split("\n")
-    for line in lines:
-        elements = line.split("&")
-        if len(elements) > 1:
-            data.append([e.replace("\\", "").strip() for e in elements])
-    data = np.asanyarray(data)
-    data = data.T
-    for i in range(data.shape[0]):
-        if i == 0:
-            to_return += "\\toprule\n"
-        elif i == 1:
-            to_return += "\\midrule\n"
-        for j in range(data.shape[1]):
-            if j > 0:
-                to_return += " & "
-            to_return += data[i, j]
-        to_return += " \\\\ \n"
-    to_return += r"\bottomrule"
-    return to_return
\ No newline at end of file
+    if not isinstance(table_string, Table):
+        table_string = Table.from_latex(table_string)
+    return table_string.T.to_latex(booktabs=True)
@@ -0,0 +1,551 @@
+import unittest
+from unittest import mock
+import asyncio
+import os
+import tempfile
+import numpy as np
+from utils_unibs.files import (
+    load_from_folder,
+    iter_from_folder,
+    save_file,
+    set_cache,
+    clear_cache,
+    get_cache_stats,
+    aload_from_folder,
+    asave_file,
+    BackgroundWriter,
+    register_format,
+    _LOADERS,
+    _SAVERS,
+    _EXTENSIONS,
+    _TYPES,
+    _MAGIC,
+    _APPENDABLE,
+    _sniff_format,
+    iter_jsonl,
+    LazyLines,
+    select_files,
+    scan_folder,
+    load_manifest,
+    changed_since,
+    save_sharded,
+    load_sharded,
+    set_quiet,
+    add_hook,
+    remove_hook,
+    get_summary,
+    reset_summary,
+)
+from utils_unibs.constants import C
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    Test case that works in a temporary directory, removed after each test
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestLoadFromFolder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        save_file({"a": 1}, self.dir, "f1.json")
+        save_file(["line 1\n", "line 2\n"], self.dir, "f2.txt")
+        save_file([1, 2, 3], self.dir, "f3")
+        self.files = ["f1.json", "missing.json", "f2.txt", "f3"]
+        self.sol = [{"a": 1}, None, ["line 1\n", "line 2\n"], [1, 2, 3]]
+
+    def test_serial(self):
+        self.assertEqual(load_from_folder(self.dir, self.files), self.sol)
+
+    def test_unknown_format(self):
+        with open(os.path.join(self.dir, "notes"), "w") as f:
+            f.write("some notes\nabout the runs\n")
+        open(os.path.join(self.dir, "empty"), "w").close()
+        set_quiet()
+        try:
+            self.assertEqual(load_from_folder(self.dir, ["notes", "empty", "f3"]), [None, None, [1, 2, 3]])
+        finally:
+            set_quiet(False)
+
+    def test_workers(self):
+        self.assertEqual(load_from_folder(self.dir, self.files, workers=3), self.sol)
+        self.assertEqual(
+            load_from_folder(self.dir, self.files, workers=2, pool=C.PROCESS), self.sol
+        )
+        self.assertRaises(
+            ValueError, load_from_folder, self.dir, self.files, workers=2, pool="fdsfds"
+        )
+
+    def test_process_chunks(self):
+        files = [f"g{i}.json" for i in range(40)]
+        for i, name in enumerate(files):
+            save_file({"i": i}, self.dir, name)
+        loaded = load_from_folder(self.dir, files + ["missing.json"], workers=2, pool=C.PROCESS)
+        self.assertEqual(loaded, [{"i": i} for i in range(40)] + [None])
+
+
+class TestIterFromFolder(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            save_file({"i": i}, self.dir, f"f{i}.json")
+        self.files = [f"f{i}.json" for i in range(5)] + ["missing.json"]
+        self.sol = [(f"f{i}.json", {"i": i}) for i in range(5)] + [("missing.json", None)]
+
+    def test_lazy(self):
+        self.assertEqual(list(iter_from_folder(self.dir, self.files)), self.sol)
+
+    def test_prefetch(self):
+        self.assertEqual(
+            list(iter_from_folder(self.dir, iter(self.files), prefetch=2)), self.sol
+        )
+        it = iter_from_folder(self.dir, self.files, prefetch=1)
+        self.assertEqual(next(it), self.sol[0])
+        it.close()
+
+    def test_prefetch_iterator_error(self):
+        def names():
+            yield "f0.json"
+            raise OSError("scandir failed")
+
+        it = iter_from_folder(self.dir, names(), prefetch=2)
+        self.assertEqual(next(it), self.sol[0])
+        self.assertRaises(OSError, next, it)
+
+
+class TestCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            save_file({"i": [i]}, self.dir, f"f{i}.json")
+        clear_cache()
+
+    def tearDown(self):
+        set_cache(enabled=False, max_entries=128, max_bytes=1 << 30, mode=C.CACHE_COPY)
+        clear_cache()
+        super().tearDown()
+
+    def test_hits(self):
+        set_cache(max_entries=2)
+        load_from_folder(self.dir, ["f0.json", "f1.json", "f0.json", "f2.json", "f1.json"])
+        stats = get_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["entries"], 2)
+
+    def test_invalidation(self):
+        set_cache()
+        self.assertEqual(load_from_folder(self.dir, ["f0.json"]), [{"i": [0]}])
+        save_file({"i": [0, 0, 0]}, self.dir, "f0.json")
+        self.assertEqual(load_from_folder(self.dir, ["f0.json"]), [{"i": [0, 0, 0]}])
+        self.assertEqual(get_cache_stats()["entries"], 1)
+
+    def test_modes(self):
+        set_cache(mode=C.CACHE_COPY)
+        load_from_folder(self.dir, ["f0.json"])[0]["i"].append(1)
+        self.assertEqual(load_from_folder(self.dir, ["f0.json"]), [{"i": [0]}])
+        set_cache(mode=C.CACHE_FREEZE)
+        o = load_from_folder(self.dir, ["f0.json"])[0]
+        self.assertEqual(o["i"], (0,))
+        with self.assertRaises(TypeError):
+            o["i"] = 1
+        self.assertFalse(set_cache(mode="fdsfds"))
+
+    def test_freeze_arrays(self):
+        set_cache(mode=C.CACHE_FREEZE)
+        save_file(np.arange(3.0), self.dir, "a.npy")
+        save_file({"x": np.arange(3.0)}, self.dir, "a.pkl")
+        a, d = load_from_folder(self.dir, ["a.npy", "a.pkl"])
+        with self.assertRaises(ValueError):
+            a[0] = 99
+        with self.assertRaises(ValueError):
+            d["x"][0] = 99
+        self.assertEqual(load_from_folder(self.dir, ["a.npy"])[0].tolist(), [0.0, 1.0, 2.0])
+
+
+class TestNumpy(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.x = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+    def test_npy(self):
+        self.assertTrue(save_file(self.x, self.dir, "x.npy"))
+        [x] = load_from_folder(self.dir, ["x.npy"])
+        np.testing.assert_array_equal(x, self.x)
+        [x] = load_from_folder(self.dir, ["x.npy"], mmap_mode="r")
+        self.assertIsInstance(x, np.memmap)
+        np.testing.assert_array_equal(x[1], self.x[1])
+        self.assertFalse(save_file(np.array([{}]), self.dir, "o.npy"))
+
+    def test_npz(self):
+        self.assertTrue(save_file({"a": self.x, "b": self.x.T}, self.dir, "x.npz"))
+        [x] = load_from_folder(self.dir, ["x.npz"])
+        np.testing.assert_array_equal(x["a"], self.x)
+        np.testing.assert_array_equal(x["b"], self.x.T)
+
+
+class TestCompression(TempDirTestCase):
+    def test_round_trip(self):
+        o = {"a": list(range(100))}
+        self.assertTrue(save_file(o, self.dir, "f.json.gz", compression_level=9, compact=True))
+        self.assertTrue(save_file(o, self.dir, "f.pkl.xz", compression_level=1))
+        self.assertTrue(save_file(["a\n", "b\n"], self.dir, "f.txt.bz2"))
+        self.assertTrue(save_file(np.eye(3), self.dir, "f.npy.gz"))
+        [f1, f2, f3, f4] = load_from_folder(
+            self.dir, ["f.json.gz", "f.pkl.xz", "f.txt.bz2", "f.npy.gz"]
+        )
+        self.assertEqual(f1, o)
+        self.assertEqual(f2, o)
+        self.assertEqual(f3, ["a\n", "b\n"])
+        np.testing.assert_array_equal(f4, np.eye(3))
+
+
+class TestOutOfBand(TempDirTestCase):
+    def side_cars(self):
+        return [name for name in os.listdir(self.dir) if name.endswith(C.BUFFERS_EXT)]
+
+    def test_round_trip(self):
+        o = {"a": np.arange(1000.0), "b": [np.ones((3, 3)), "c"], "d": 1}
+        self.assertTrue(save_file(o, self.dir, "f.pkl", out_of_band=True))
+        self.assertEqual(len(self.side_cars()), 1)
+        [f] = load_from_folder(self.dir, ["f.pkl"])
+        np.testing.assert_array_equal(f["a"], o["a"])
+        np.testing.assert_array_equal(f["b"][0], o["b"][0])
+        self.assertEqual(f["b"][1], "c")
+        self.assertEqual(f["d"], 1)
+        f["a"][0] = 5
+
+        self.assertTrue(save_file({"e": 1}, self.dir, "f.pkl", out_of_band=True))
+        self.assertEqual(load_from_folder(self.dir, ["f.pkl"]), [{"e": 1}])
+        self.assertTrue(save_file({"e": 2}, self.dir, "f.pkl"))
+        self.assertEqual(self.side_cars(), [])
+        self.assertEqual(load_from_folder(self.dir, ["f.pkl"]), [{"e": 2}])
+
+    def test_overwrite_loaded(self):
+        x = np.arange(1e6)
+        save_file({"a": x}, self.dir, "f.pkl", out_of_band=True)
+        [f] = load_from_folder(self.dir, ["f.pkl"])
+        save_file({"a": np.arange(10.0)}, self.dir, "f.pkl", out_of_band=True)
+        self.assertEqual(f["a"].sum(), x.sum())
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "/proc/self/fd is not available")
+    def test_descriptors(self):
+        names = [f"f{i}.pkl" for i in range(20)]
+        for name in names:
+            save_file({"a": np.ones(1000)}, self.dir, name, out_of_band=True)
+        before = len(os.listdir("/proc/self/fd"))
+        loaded = load_from_folder(self.dir, names)
+        self.assertEqual(len(os.listdir("/proc/self/fd")), before)
+        self.assertEqual(sum(o["a"].sum() for o in loaded), 20000)
+
+
+class TestAsync(TempDirTestCase):
+    def test_round_trip(self):
+        async def run():
+            semaphore = asyncio.Semaphore(2)
+            saved = await asyncio.gather(
+                *[
+                    asave_file({"i": i}, self.dir, f"f{i}.json", semaphore=semaphore)
+                    for i in range(5)
+                ]
+            )
+            loaded = await aload_from_folder(
+                self.dir, [f"f{i}.json" for i in range(5)] + ["missing"], limit=2
+            )
+            return saved, loaded
+
+        saved, loaded = asyncio.run(run())
+        self.assertEqual(saved, [True] * 5)
+        self.assertEqual(loaded, [{"i": i} for i in range(5)] + [None])
+
+
+class TestAtomicWriter(TempDirTestCase):
+    def test_atomic(self):
+        self.assertTrue(save_file({"a": 1}, self.dir, "f.json.gz", atomic=True))
+        self.assertTrue(save_file({"a": np.ones(3)}, self.dir, "f.pkl", out_of_band=True, atomic=True))
+        self.assertFalse(save_file(lambda x: x, self.dir, "g.pkl", atomic=True))
+        names = sorted(os.listdir(self.dir))
+        self.assertEqual(names[:2], ["f.json.gz", "f.pkl"])
+        self.assertEqual(len(names), 3)
+        self.assertTrue(names[2].startswith("f.pkl.") and names[2].endswith(C.BUFFERS_EXT))
+        [f, g] = load_from_folder(self.dir, ["f.json.gz", "f.pkl"])
+        self.assertEqual(f, {"a": 1})
+        np.testing.assert_array_equal(g["a"], np.ones(3))
+
+    def test_atomic_out_of_band_crash(self):
+        save_file({"a": np.arange(10.0)}, self.dir, "f.pkl", out_of_band=True, atomic=True)
+        with mock.patch("utils_unibs.files.os.replace", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                save_file({"a": np.ones(20)}, self.dir, "f.pkl", out_of_band=True, atomic=True)
+        [f] = load_from_folder(self.dir, ["f.pkl"])
+        np.testing.assert_array_equal(f["a"], np.arange(10.0))
+        self.assertEqual(len(os.listdir(self.dir)), 2)
+
+    def test_atomic_subdir(self):
+        os.makedirs(os.path.join(self.dir, "sub"))
+        self.assertTrue(save_file({"a": 1}, self.dir, os.path.join("sub", "y.json"), atomic=True))
+        self.assertEqual(os.listdir(os.path.join(self.dir, "sub")), ["y.json"])
+
+    def test_writer(self):
+        with BackgroundWriter(max_pending=2) as writer:
+            for i in range(10):
+                writer.submit({"i": i}, self.dir, "f.json")
+                writer.submit({"i": i}, self.dir, f"g{i}.json")
+            writer.flush()
+            self.assertEqual(load_from_folder(self.dir, ["f.json"]), [{"i": 9}])
+            writer.submit(lambda x: x, self.dir, "h.pkl")
+        self.assertEqual(writer.failed, [(self.dir, "h.pkl")])
+        self.assertEqual(len(os.listdir(self.dir)), 11)
+        self.assertRaises(RuntimeError, writer.submit, {}, self.dir, "f.json")
+
+
+class TestRegistry(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        # the registry is global, so the formats registered by the tests are removed even if they fail
+        saved = [(r, r.copy()) for r in (_LOADERS, _SAVERS, _EXTENSIONS, _TYPES, _APPENDABLE)]
+        magic = list(_MAGIC)
+
+        def restore():
+            for registry, old in saved:
+                registry.clear()
+                registry.update(old)
+            _MAGIC[:] = magic
+
+        self.addCleanup(restore)
+
+    def test_sniffing(self):
+        with open(os.path.join(self.dir, "f1"), "w") as wf:
+            wf.write('\n  {"a": 1}')
+        save_file(np.eye(2), self.dir, "f2.npy")
+        os.rename(os.path.join(self.dir, "f2.npy"), os.path.join(self.dir, "f2"))
+        save_file([1], self.dir, "f3")
+        [f1, f2, f3] = load_from_folder(self.dir, ["f1", "f2", "f3"])
+        self.assertEqual(f1, {"a": 1})
+        np.testing.assert_array_equal(f2, np.eye(2))
+        self.assertEqual(f3, [1])
+
+    def test_register(self):
+        def load_upper(read_file, **options):
+            with open(read_file) as rf:
+                return rf.read().upper()
+
+        def save_upper(o, path, **options):
+            with open(path, "w") as wf:
+                wf.write("UPPER" + o)
+
+        register_format("upper", [".up"], load_upper, save_upper, [b"UPPER"])
+        self.assertTrue(save_file("abc", self.dir, "f.up"))
+        self.assertTrue(save_file("def", self.dir, "g.UP"))
+        os.rename(os.path.join(self.dir, "g.UP"), os.path.join(self.dir, "g"))
+        self.assertEqual(load_from_folder(self.dir, ["f.up", "g"]), ["UPPERABC", "UPPERDEF"])
+
+    def test_register_magic(self):
+        save_file({"a": 1}, self.dir, "f.pkl")
+        register_format("raw", [".raw"], magic=[b"\x80"])
+        self.assertEqual(_sniff_format(os.path.join(self.dir, "f.pkl")), "raw")
+        register_format("raw", [".raw"], magic=[b"RAW"])
+        self.assertEqual(_sniff_format(os.path.join(self.dir, "f.pkl")), C.PICKLE_FORMAT)
+        self.assertEqual([m for m, name in _MAGIC if name == "raw"], [b"RAW"])
+
+
+class TestJsonl(TempDirTestCase):
+    def test_append(self):
+        for name in ["log.jsonl", "log.jsonl.gz"]:
+            self.assertTrue(save_file([{"i": 0}, {"i": 1}], self.dir, name))
+            self.assertTrue(save_file([{"i": 2}], self.dir, name, append=True))
+            self.assertTrue(save_file([{"i": 3}], self.dir, name, append=True, atomic=True))
+            self.assertEqual(load_from_folder(self.dir, [name]), [[{"i": i} for i in range(4)]])
+
+    def test_append_mapping(self):
+        self.assertTrue(save_file([{"i": 0}], self.dir, "log.jsonl"))
+        self.assertTrue(save_file({"i": 1}, self.dir, "log.jsonl", append=True))
+        self.assertEqual(load_from_folder(self.dir, ["log.jsonl"]), [[{"i": 0}, {"i": 1}]])
+
+    def test_append_txt(self):
+        self.assertTrue(save_file(["a\n"], self.dir, "f.txt"))
+        self.assertTrue(save_file(["b\n"], self.dir, "f.txt", append=True))
+        self.assertEqual(load_from_folder(self.dir, ["f.txt"]), [["a\n", "b\n"]])
+
+    def test_append_unsupported(self):
+        self.assertTrue(save_file({"a": 1}, self.dir, "f.json"))
+        set_quiet()
+        try:
+            self.assertFalse(save_file({"b": 2}, self.dir, "f.json", append=True))
+        finally:
+            set_quiet(False)
+        self.assertEqual(load_from_folder(self.dir, ["f.json"]), [{"a": 1}])
+
+    def test_iter(self):
+        save_file([{"i": i} for i in range(10)], self.dir, "log.jsonl")
+        self.assertEqual(len(list(iter_jsonl(self.dir, "log.jsonl"))), 10)
+        self.assertEqual(
+            list(iter_jsonl(self.dir, "log.jsonl", lambda r: r["i"] % 2 == 1, limit=2)),
+            [{"i": 1}, {"i": 3}],
+        )
+        self.assertEqual(list(iter_jsonl(self.dir, "log.jsonl", limit=0)), [])
+
+
+class TestLazyLines(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.lines = [f"(line {i})\n" for i in range(100)] + ["last"]
+        save_file(self.lines, self.dir, "p.pddl")
+        save_file([], self.dir, "empty.txt")
+
+    def test_lines(self):
+        [p, e] = load_from_folder(self.dir, ["p.pddl", "empty.txt"], type=C.LAZY_TXT)
+        self.assertIsInstance(p, LazyLines)
+        self.assertEqual(len(p), len(self.lines))
+        self.assertEqual(p[0], self.lines[0])
+        self.assertEqual(p[-1], "last")
+        self.assertEqual(p[10:20:3], self.lines[10:20:3])
+        self.assertEqual(list(p), self.lines)
+        self.assertRaises(IndexError, p.__getitem__, 101)
+        self.assertEqual(len(e), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "p.pddl" + C.LINES_INDEX_EXT)))
+        p.close()
+
+        save_file(self.lines[:3], self.dir, "p.pddl")
+        [p] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT, workers=2)
+        self.assertEqual(list(p), self.lines[:3])
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "/proc/self/fd is not available")
+    def test_descriptors(self):
+        before = len(os.listdir("/proc/self/fd"))
+        loaded = [load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)[0] for _ in range(20)]
+        self.assertEqual([p[1] for p in loaded], [self.lines[1]] * 20)
+        self.assertEqual(len(os.listdir("/proc/self/fd")), before)
+
+    def test_overwrite(self):
+        [p] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)
+        self.assertEqual(p[0], self.lines[0])
+        save_file(["short\n"], self.dir, "p.pddl")
+        self.assertEqual(p[50], "")
+        [p] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)
+        self.assertEqual(list(p), ["short\n"])
+
+    def test_chunks(self):
+        with mock.patch.object(LazyLines, "_CHUNK", 16):
+            [p] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)
+            self.assertEqual(list(p), self.lines)
+            self.assertEqual(p[::-7], self.lines[::-7])
+
+    def test_cached_close(self):
+        set_cache()
+        try:
+            [p] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)
+            p.close()
+            [q] = load_from_folder(self.dir, ["p.pddl"], type=C.LAZY_TXT)
+            self.assertEqual(q[0], self.lines[0])
+        finally:
+            set_cache(enabled=False)
+            clear_cache()
+
+
+class TestManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            save_file({"i": i}, self.dir, f"f{i}.json")
+        save_file([1], self.dir, "g.pkl", out_of_band=True)
+
+    def test_select(self):
+        self.assertEqual(select_files(self.dir), ["f0.json", "f1.json", "f2.json", "g.pkl"])
+        self.assertEqual(select_files(self.dir, "*.json", r"[12]"), ["f1.json", "f2.json"])
+
+    def test_changed(self):
+        manifest = scan_folder(self.dir, checksum=True, save=True)
+        self.assertEqual(load_manifest(self.dir), manifest)
+        self.assertEqual(manifest["f0.json"]["format"], C.JSON_FORMAT)
+        self.assertEqual(changed_since(self.dir, manifest), [])
+        save_file({"i": 1}, self.dir, "f1.json")
+        os.utime(os.path.join(self.dir, "f1.json"), ns=(1, 1))
+        save_file({"i": 10}, self.dir, "f2.json")
+        save_file({"i": 3}, self.dir, "f3.json")
+        self.assertEqual(changed_since(self.dir, manifest), ["f1.json", "f2.json", "f3.json"])
+        self.assertEqual(
+            changed_since(self.dir, manifest, "*.json", checksum=True), ["f2.json", "f3.json"]
+        )
+        self.assertEqual(changed_since(self.dir, scan_folder(self.dir)), [])
+
+
+class TestSharded(TempDirTestCase):
+    def test_list(self):
+        o = [{"i": i} for i in range(25)]
+        self.assertTrue(save_file(o, self.dir, "ep.json.gz", shard_size=10))
+        self.assertEqual(len(select_files(self.dir, "ep.*.json.gz")), 3)
+        self.assertEqual(load_sharded(self.dir, "ep.json.gz"), o)
+        self.assertEqual(load_sharded(self.dir, "ep.json.gz", 8, 12, workers=2), o[8:12])
+        self.assertEqual(load_sharded(self.dir, "ep.json.gz", 30), [])
+        self.assertTrue(save_sharded(o[:5], self.dir, "ep.json.gz", 10))
+        self.assertEqual(select_files(self.dir, "ep.*.json.gz"), ["ep.00000.json.gz"])
+        self.assertIsNone(load_sharded(self.dir, "missing"))
+
+    def test_array(self):
+        x = np.arange(100).reshape(50, 2)
+        self.assertTrue(save_sharded(x, self.dir, "x.npy", 7))
+        np.testing.assert_array_equal(load_sharded(self.dir, "x.npy"), x)
+        np.testing.assert_array_equal(
+            load_sharded(self.dir, "x.npy", 20, -5, mmap_mode="r"), x[20:-5]
+        )
+
+
+class TestMonitor(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.events = []
+        set_quiet()
+        reset_summary()
+        add_hook(self.events.append)
+
+    def tearDown(self):
+        remove_hook(self.events.append)
+        set_quiet(False)
+        super().tearDown()
+
+    def test_events(self):
+        save_file({"a": 1}, self.dir, "f.json")
+        load_from_folder(self.dir, ["f.json", "missing"])
+        self.assertEqual([e["action"] for e in self.events], ["save", "load", "load"])
+        self.assertEqual([e["ok"] for e in self.events], [True, True, False])
+        self.assertEqual(self.events[0]["format"], C.JSON_FORMAT)
+        size = os.path.getsize(os.path.join(self.dir, "f.json"))
+        self.assertEqual(self.events[1]["bytes"], size)
+        summary = get_summary()
+        self.assertEqual(summary["loads"], 2)
+        self.assertEqual(summary["saves"], 1)
+        self.assertEqual(summary["bytes_read"], size)
+        self.assertEqual(summary["bytes_written"], size)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(len(summary["slowest"]), 3)
+
+    def test_faulty_hook(self):
+        def hook(event):
+            raise RuntimeError("metrics down")
+
+        add_hook(hook)
+        try:
+            with self.assertLogs("utils_unibs.files", level="ERROR"):
+                self.assertTrue(save_file({"a": 1}, self.dir, "f.json"))
+                self.assertEqual(load_from_folder(self.dir, ["f.json"]), [{"a": 1}])
+        finally:
+            remove_hook(hook)
+        self.assertEqual(len(self.events), 2)
+
+    def test_append_bytes(self):
+        save_file(["a\n"], self.dir, "f.txt")
+        save_file(["b\n"], self.dir, "f.txt", append=True)
+        save_file({"a": 1}, self.dir, "f.json")
+        save_file({"a": 1}, self.dir, "f.json", append=True)
+        size = os.path.getsize(os.path.join(self.dir, "f.json"))
+        self.assertEqual([e["bytes"] for e in self.events], [2, 2, size, 0])
+        self.assertEqual([e["ok"] for e in self.events], [True, True, True, False])
@@ -1,5 +1,7 @@
 import unittest
-from utils_unibs.plots import set_size, CS, _update_dimension, plt
+import os
+import tempfile
+from utils_unibs.plots import set_size, CS, _update_dimension, plt, render_plots
 
 
 def reset_values():
@@ -133,3 +135,32 @@ class TestUpdateDimension(unittest.TestCase):
         self.assertTrue(_update_dimension("latex", "  FALSE  "))
         self.assertEqual(plt.rcParams["text.usetex"], False)
         self.assertFalse(_update_dimension("latex", "small"))
+
+
+class TestRenderPlots(unittest.TestCase):
+    specs = [
+        {"kind": "line", "dataset": [[1, 2, 3], [3, 2, 1]], "labels": ["a", "b"], "title": "line"},
+        {"kind": "hist", "dataset": [[1, 2], [3, 4]], "xticks": [0, 1], "xticks_labels": ["x", "y"]},
+    ]
+
+    def test_sequential(self):
+        figures = render_plots(self.specs + [{"dataset": [1, 2]}])
+        self.assertTrue(figures[0].startswith(b"\x89PNG"))
+        self.assertTrue(figures[1].startswith(b"\x89PNG"))
+        self.assertIsNone(figures[2])
+        self.assertRaises(ValueError, render_plots, [{"kind": "fdsfds"}])
+        self.assertRaises(ValueError, render_plots, self.specs, 2, "fdsfds")
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            specs = [dict(spec, save_fig=os.path.join(tmp, str(i))) for i, spec in enumerate(self.specs)]
+            paths = render_plots(specs, workers=2)
+            self.assertEqual(paths, [os.path.join(tmp, "0.png"), os.path.join(tmp, "1.png")])
+            self.assertTrue(all(os.path.exists(p) for p in paths))
+
+    def test_process(self):
+        set_size("medium", 19)
+        try:
+            self.assertEqual(render_plots(self.specs, workers=2), render_plots(self.specs))
+        finally:
+            reset_values()
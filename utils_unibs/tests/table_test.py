@@ -1,5 +1,25 @@
 import unittest
-from utils_unibs.tables import get_idxs, print_latex_table, transpose_latex_table
+import importlib.util
+import io
+import numpy as np
+from utils_unibs.tables import (
+    get_idxs,
+    print_latex_table,
+    transpose_latex_table,
+    _get_best_mask,
+    _get_rank_mask,
+    iter_latex_table,
+    write_latex_table,
+    print_text_table,
+    iter_text_table,
+    write_text_table,
+    Table,
+    build_latex_table,
+    aggregate_runs,
+    build_aggregate_table,
+    print_aggregate_table,
+    LiveTable,
+)
 from utils_unibs.constants import C
 
 
@@ -89,6 +109,220 @@ class TestPrintLatexTable(unittest.TestCase):
         )
 
 
+class TestFormatting(unittest.TestCase):
+    def test_precision(self):
+        x = [[1.234, 2, "a_b"], [5, 6.789, "a_b"]]
+        sol = " & 1.2 & 2.000 & a\\_b \\\\\n & 5.0 & 6.789 & a\\_b \\\\\n"
+        self.assertEqual(print_latex_table(x, precision=[1, 3, 0]), sol)
+        sol = ["    1.2       2.000         a_b     ", "    5.0       6.789         a_b     "]
+        self.assertEqual(print_text_table("", ["a", "b", "c"], x, just=7, precision=[1, 3, 0])[4:6], sol)
+
+    def test_text_columns(self):
+        x = [[1, "a"], ["b", np.float64(2.5)], [np.uint8(3), False]]
+        sol = ["  1.0         a     ", "    b       2.5     ", "  3.0     False     "]
+        self.assertEqual(print_text_table("", ["a", "b"], x, just=5, precision=1)[4:7], sol)
+        sol = ["  1.0         a     ", "  3.0      None       7.0     "]
+        self.assertEqual(print_text_table("", ["a", "b"], [x[0], [3, None, 7]], just=5, precision=1)[4:6], sol)
+
+
+class TestBestMask(unittest.TestCase):
+    x = [[1, 5, 3, 0], [4, 2, float("nan"), 8], [float("nan"), float("nan"), 1, 1]]
+
+    def test_nan(self):
+        sol = [[False, True, True, False], [True, False, False, True], [False, False, True, True]]
+        self.assertEqual(_get_best_mask(np.array(self.x), C.MAX, C.ROW, 2).tolist(), sol)
+        sol = [[True, False, True, True], [False, True, False, False], [False, False, True, True]]
+        self.assertEqual(_get_best_mask(np.array(self.x), C.MIN, C.COLUMN, 2).tolist(), sol)
+        sol = " & 1.0 & \\bf{5.0} & \\bf{3.0} & 0.0 \\\\\n"
+        self.assertTrue(
+            print_latex_table(self.x, best=C.MAX, axis=C.COLUMN).startswith(sol)
+        )
+
+
+class TestRanking(unittest.TestCase):
+    x = [[1, 5, 3], [4, 2, 8], [2, 7, 1]]
+
+    def test_rank(self):
+        x = np.array([[1, 5, 3, 0], [4, 2, float("nan"), 8], [4, 7, 2, 3]])
+        sol = [[0, 2, 1, 0], [1, 0, 0, 1], [1, 1, 2, 2]]
+        self.assertEqual(_get_rank_mask(x, C.MAX, C.COLUMN, -1, 2).tolist(), sol)
+        sol = [[2, 2, 1, 2], [1, 1, 2, 1]]
+        self.assertEqual(_get_rank_mask(x.astype(object)[[0, 2]], C.MAX, C.COLUMN, -1, 2).tolist(), sol)
+        sol = [[1, 0, 2, 1], [2, 1, 0, 1], [2, 0, 1, 1]]
+        self.assertEqual(_get_rank_mask(x, C.MIN, C.ROW, 3, 2).tolist(), sol)
+
+    def test_styles(self):
+        sol = " & 1 & \\underline{5} & \\underline{3} \\\\\n & \\bf{4} & 2 & \\bf{8} \\\\\n & \\underline{2} & \\bf{7} & 1 \\\\\n"
+        rows = print_latex_table(self.x, best=C.MAX, axis=C.COLUMN, precision=0, top=2)
+        self.assertEqual(rows, sol)
+        self.assertEqual(transpose_latex_table(transpose_latex_table(rows)).count("\\underline"), 3)
+        styles = ("\\bf", "\\cellcolor{gray!25}")
+        sol = " & \\bf{1} & \\cellcolor{gray!25}{5} & \\cellcolor{gray!25}{3} \\\\\n"
+        rows = print_latex_table(self.x, best=C.MIN, axis=C.ROW, precision=0, top=3, styles=styles)
+        self.assertTrue(rows.startswith(sol))
+        t = build_latex_table(self.x, best=C.MAX, precision=0, top=2)
+        self.assertEqual(t.to_markdown().split("\n")[2], "|  | 1 | *5* | *3* |")
+
+
+class TestStreaming(unittest.TestCase):
+    x = [[1, 2, 3], [3, 2, 1], [2, 2, 2], [0, 5, 1]]
+
+    def test_latex(self):
+        sol = print_latex_table(self.x, best=C.MAX, axis=C.COLUMN, count_vals=2, hline=3)
+        rows = iter_latex_table(
+            (r for r in self.x), best=C.MAX, axis=C.COLUMN, count_vals=2, hline=3
+        )
+        self.assertEqual("".join(rows), sol)
+        f = io.StringIO()
+        self.assertEqual(
+            write_latex_table(f, iter(self.x), best=C.MAX, axis=C.COLUMN, count_vals=2, hline=3), 4
+        )
+        self.assertEqual(f.getvalue(), sol)
+
+    def test_text(self):
+        sol = print_text_table("T", ["a", "b", "c"], self.x, just=4)
+        self.assertEqual(list(iter_text_table("T", ["a", "b", "c"], iter(self.x), just=4)), sol)
+        f = io.StringIO()
+        self.assertEqual(write_text_table(f, "T", ["a", "b", "c"], iter(self.x), just=4), 9)
+        self.assertEqual(f.getvalue(), "\n".join(sol) + "\n")
+
+    def test_auto_width(self):
+        rows = [[np.float32(1.5), np.int64(3), "abc", None], [2.25, 10000, "x", True]]
+        sol = ["T", "-" * 33, "  a           b       c        d     ", "-" * 33,
+               "1.5         3.0     abc     None     ", "2.2     10000.0       x     True     ", "-" * 33]
+        self.assertEqual(print_text_table("T", ["a", "b", "c", "d"], rows, just=None, precision=1), sol)
+        self.assertEqual(list(iter_text_table("T", ["a", "b", "c", "d"], rows, None, 1, two_pass=True)), sol)
+        self.assertEqual(list(iter_text_table("T", ["a", "b", "c", "d"], iter(rows), None, 1)), sol)
+        self.assertRaises(ValueError, list, iter_text_table("T", ["a"], iter(rows), None, two_pass=True))
+
+    def test_repeat_header(self):
+        lines = list(iter_text_table("T", ["a", "b"], iter(self.x), just=4, repeat_header=2))
+        self.assertEqual(len(lines), 12)
+        self.assertEqual(lines[7], lines[2])
+
+
+class TestExport(unittest.TestCase):
+    t = build_latex_table(
+        [[1, 2], [4, 3]], labels=["a|b", "c<d"], headers=["x_1", "y"], best=C.MAX, axis=C.COLUMN, precision=0
+    )
+
+    def test_formats(self):
+        exported = self.t.export(title="T", just=4)
+        self.assertEqual(
+            exported[C.LATEX_TABLE],
+            " & x\\_1 & y \\\\\na|b & 1 & 2 \\\\\nc\\textless{}d & \\bf{4} & \\bf{3} \\\\\n",
+        )
+        self.assertEqual(
+            exported[C.TEXT_TABLE],
+            ["T", "-" * 23, "          x_1        y     ", "-" * 23,
+             " a|b        1        2     ", " c<d       4*       3*     ", "-" * 23],
+        )
+        self.assertEqual(
+            exported[C.MARKDOWN_TABLE],
+            "|  | x_1 | y |\n|---|---|---|\n| a\\|b | 1 | 2 |\n| c<d | **4** | **3** |\n",
+        )
+        self.assertEqual(exported[C.CSV_TABLE], ",x_1,y\na|b,1,2\nc<d,4,3\n")
+        self.assertIn("<th>c&lt;d</th><td><b>4</b></td>", exported[C.HTML_TABLE])
+        self.assertEqual(list(self.t.export([C.CSV_TABLE])), [C.CSV_TABLE])
+        self.assertRaises(ValueError, self.t.export, ["fdsfds"])
+
+
+class TestColumnar(unittest.TestCase):
+    columns = {"name": np.array(["a_b", "c"]), "acc": np.array([0.5, 0.7]), "loss": np.array([0.3, 0.1])}
+
+    def test_dict(self):
+        sol = " & a\\_b & 0.5 & \\bf{0.3} \\\\\n & c & \\bf{0.7} & 0.1 \\\\\n"
+        self.assertEqual(print_latex_table(self.columns, best=C.MAX, axis=C.COLUMN), sol)
+        t = build_latex_table(self.columns, labels=["x", "y"], best=C.MIN, axis=C.ROW)
+        self.assertEqual(t.headers, ["name", "acc", "loss"])
+        self.assertEqual(t.to_csv(), ",name,acc,loss\nx,a_b,0.5,0.3\ny,c,0.7,0.1\n")
+        self.assertTrue(np.shares_memory(t._columns[1], self.columns["acc"]))
+
+    def test_structured(self):
+        x = np.array([("a", 1, 2.5), ("b", 3, 0.5)], dtype=[("n", "U3"), ("i", "i8"), ("f", "f8")])
+        sol = " & a & 1 & \\bf{2} \\\\\n & b & \\bf{3} & 0 \\\\\n"
+        self.assertEqual(print_latex_table(x, best=C.MAX, axis=C.ROW, precision=0), sol)
+        self.assertEqual(build_latex_table(x).headers, ["n", "i", "f"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pandas"), "pandas is not installed")
+    def test_pandas(self):
+        import pandas as pd
+
+        df = pd.DataFrame(self.columns)
+        sol = " & a\\_b & 0.5 & \\bf{0.3} \\\\\n & c & \\bf{0.7} & 0.1 \\\\\n"
+        self.assertEqual(print_latex_table(df, best=C.MAX, axis=C.COLUMN), sol)
+        t = build_latex_table(df, best=C.MIN, axis=C.ROW)
+        self.assertEqual(t.headers, ["name", "acc", "loss"])
+        self.assertEqual(t._highlight.tolist(), [[0, 0, 1], [0, 0, 1]])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_pyarrow(self):
+        import pyarrow as pa
+
+        table = pa.table({k: v.tolist() for k, v in self.columns.items()})
+        sol = " & a\\_b & 0.5 & \\bf{0.3} \\\\\n & c & \\bf{0.7} & 0.1 \\\\\n"
+        self.assertEqual(print_latex_table(table, best=C.MAX, axis=C.COLUMN), sol)
+        t = build_latex_table(table, best=C.MIN, axis=C.ROW)
+        self.assertEqual(t.headers, ["name", "acc", "loss"])
+        self.assertEqual(t._highlight.tolist(), [[0, 0, 1], [0, 0, 1]])
+
+
+class TestAggregate(unittest.TestCase):
+    runs = np.array([[[1, 2, 3], [4, 5, 6]], [[2, 2, 2], [0, 1, 2]]])
+
+    def test_stats(self):
+        stats = aggregate_runs(self.runs)
+        self.assertEqual(stats[C.MEAN].tolist(), [[2, 5], [2, 1]])
+        self.assertEqual(stats[C.STD].tolist(), [[1, 1], [0, 1]])
+        self.assertAlmostEqual(stats[C.CI][0, 0], 4.303 / np.sqrt(3), places=3)
+        ci = aggregate_runs([[list(range(10))]], confidence=0.99)[C.CI][0, 0]
+        self.assertAlmostEqual(ci, 3.2498 * np.std(range(10), ddof=1) / np.sqrt(10), places=3)
+        stats = aggregate_runs([[[1, 2], [3]], [[5, 6, 7], []]])
+        self.assertEqual(stats[C.COUNT].tolist(), [[2, 1], [3, 0]])
+        self.assertEqual(stats[C.MEDIAN][1, 0], 6)
+        self.assertTrue(np.isnan(stats[C.MEAN][1, 1]))
+
+    def test_table(self):
+        sol = "a & \\bf{2.0 $\\pm$ 1.0} & \\bf{5.0 $\\pm$ 1.0} \\\\\nb & \\bf{2.0 $\\pm$ 0.0} & 1.0 $\\pm$ 1.0 \\\\\n"
+        self.assertEqual(print_aggregate_table(self.runs, labels=["a", "b"], best=C.MAX), sol)
+        t = build_aggregate_table(self.runs, headers=["x", "y"], center=C.MEDIAN, spread=None, precision=0)
+        self.assertEqual(t.to_csv(), ",x,y\n,2,5\n,2,1\n")
+        self.assertRaises(ValueError, build_aggregate_table, self.runs, spread="fdsfds")
+
+    def test_pm_escape(self):
+        self.assertEqual(print_latex_table([["a±b"]], labels=["c±d"]), "c±d & a±b \\\\\n")
+        t = build_aggregate_table(self.runs[:1], labels=["a±b"], precision=0)
+        self.assertEqual(t.to_latex(), "a±b & 2 $\\pm$ 1 & 5 $\\pm$ 1 \\\\\n")
+        self.assertIn("2 $\\pm$ 1", t.T.to_latex())
+
+
+class TestLiveTable(unittest.TestCase):
+    x = [[1, 5, 3], [4, 2, 8], [2, 7, 1], [0, 9, 3]]
+
+    def test_updates(self):
+        kwargs = dict(best=C.MAX, axis=C.COLUMN, count_vals=2, hline=2, top=2)
+        t = LiveTable(**kwargs)
+        for row in self.x:
+            t.append_row(row)
+        self.assertEqual(t.to_latex(), print_latex_table(self.x, **kwargs))
+        self.assertEqual(t.update_cell(3, 0, 5), [2, 3])
+        self.assertEqual(t.update_cell(3, 2, 2), [3])
+        self.assertEqual(t.append_column([1, 2, 3, 4]), [0, 1, 2, 3])
+        x = [[1, 5, 3, 1], [4, 2, 8, 2], [2, 7, 1, 3], [5, 9, 2, 4]]
+        self.assertEqual(t.to_latex(), print_latex_table(x, **kwargs))
+        t.update_row(1, [0, 0, 0, 0], label="a")
+        x[1] = [0, 0, 0, 0]
+        self.assertEqual(t.to_latex(), print_latex_table(x, labels=["", "a"], **kwargs))
+        self.assertEqual(t.to_table().shape, (4, 4))
+
+    def test_row_axis(self):
+        t = LiveTable(best=C.MIN, axis=C.ROW)
+        t.append_row([3, 1, 2], label="a")
+        self.assertEqual(t.line(0), "a & 3.0 & \\bf{1.0} & 2.0 \\\\\n")
+        self.assertEqual(t.update_column(2, [0]), [0])
+        self.assertEqual(t.line(0), "a & 3.0 & 1.0 & \\bf{0.0} \\\\\n")
+
+
 class TestTranspose(unittest.TestCase):
     s = r'''
     \toprule
@@ -104,6 +338,23 @@ class TestTranspose(unittest.TestCase):
     4 & 5 & 6 \\
     \bottomrule
     '''
+    def test_highlight(self):
+        s = print_latex_table([[1, 2], [4, 3]], labels=["a & b", "c"], best=C.MAX, axis=C.ROW, hline=1)
+        s_transpose = "\\toprule\na \\& b & c \\\\ \n\\midrule\n1.0 & \\bf{4.0} \\\\ \n\\bf{2.0} & 3.0 \\\\ \n\\bottomrule"
+        self.assertEqual(transpose_latex_table(s), s_transpose)
+        self.assertEqual(Table.from_latex(s).to_latex(), s)
+
+    def test_table(self):
+        x = [[1, 2, 3], [6, 5, 4]]
+        t = build_latex_table(x, labels=["a", "b"], best=C.MIN, axis=C.ROW, precision=0)
+        self.assertEqual(t.to_latex(), print_latex_table(x, labels=["a", "b"], best=C.MIN, axis=C.ROW, precision=0))
+        self.assertEqual(t.shape, (2, 3))
+        self.assertEqual(t.T.shape, (3, 2))
+        self.assertEqual(t[1].to_latex(), "b & 6 & 5 & \\bf{4} \\\\\n")
+        self.assertEqual(t.reorder(columns=[2, 0]).to_latex(), "a & 3 & \\bf{1} \\\\\nb & \\bf{4} & 6 \\\\\n")
+        self.assertEqual(t.T[1:].to_latex(), "a & b \\\\\n2 & 5 \\\\\n3 & \\bf{4} \\\\\n")
+        self.assertEqual(transpose_latex_table(t), t.T.to_latex(booktabs=True))
+
     def test_correct(self):
         s_transpose = '''\\toprule\nA & 1 & 4 \\\\ \n\midrule\nB & 2 & 5 \\\\ \nC & 3 & 6 \\\\ \n\\bottomrule'''
         self.assertEqual(transpose_latex_table(self.s), s_transpose)